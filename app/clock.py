@@ -0,0 +1,103 @@
+from datetime import datetime, timedelta
+from typing import Optional
+import os
+import threading
+import time
+
+from dotenv import load_dotenv
+
+load_dotenv()
+
+
+class SystemClock:
+    """Wall-clock time; waiting blocks for real"""
+
+    def now(self) -> datetime:
+        return datetime.now()
+
+    def time(self) -> float:
+        return time.time()
+
+    def wait_until(self, condition: threading.Condition, deadline: Optional[float]):
+        """Wait on condition (held by the caller) until notified or the deadline passes"""
+        condition.wait(None if deadline is None else max(deadline - time.time(), 0))
+
+
+class VirtualClock:
+    """
+    Simulated time that only moves when told to
+
+    Waiting for a deadline jumps straight to it instead of sleeping, so the
+    dispatcher goes from one due batch to the next without idling in between.
+    """
+
+    def __init__(self, start: Optional[datetime] = None):
+        self._now = (start or datetime.now()).timestamp()
+
+    def now(self) -> datetime:
+        return datetime.fromtimestamp(self._now)
+
+    def time(self) -> float:
+        return self._now
+
+    def wait_until(self, condition: threading.Condition, deadline: Optional[float]):
+        """Jump to the deadline; with no deadline, wait (for real) until notified"""
+        if deadline is None:
+            condition.wait()
+        else:
+            self.advance_to(deadline)
+
+    def advance_to(self, timestamp: float):
+        """Move forward to an epoch timestamp (never backwards)"""
+        if timestamp > self._now:
+            self._now = timestamp
+
+    def advance(self, delta: timedelta):
+        """Move forward by delta"""
+        self.advance_to(self._now + delta.total_seconds())
+
+
+class Clock:
+    """
+    The clock used by reminder logic, scheduling and dispatch
+
+    Defaults to the system clock. Set SIMULATED_CLOCK_START (YYYY-MM-DD HH:MM)
+    to start the app on a virtual clock instead, or swap clocks in code:
+
+        clock = VirtualClock(datetime(2025, 1, 1))
+        Clock.use(clock)
+    """
+
+    _clock = SystemClock()
+
+    @staticmethod
+    def use(clock):
+        """Replace the current clock; returns the previous one"""
+        previous, Clock._clock = Clock._clock, clock
+        return previous
+
+    @staticmethod
+    def get():
+        return Clock._clock
+
+    @staticmethod
+    def is_virtual() -> bool:
+        return isinstance(Clock._clock, VirtualClock)
+
+    @staticmethod
+    def now() -> datetime:
+        """Current local time as a naive datetime"""
+        return Clock._clock.now()
+
+    @staticmethod
+    def time() -> float:
+        """Current time as epoch seconds"""
+        return Clock._clock.time()
+
+    @staticmethod
+    def wait_until(condition: threading.Condition, deadline: Optional[float]):
+        return Clock._clock.wait_until(condition, deadline)
+
+
+if os.getenv("SIMULATED_CLOCK_START"):
+    Clock.use(VirtualClock(datetime.strptime(os.getenv("SIMULATED_CLOCK_START"), "%Y-%m-%d %H:%M")))
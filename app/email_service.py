@@ -1,25 +1,48 @@
 import smtplib
+from concurrent.futures import ThreadPoolExecutor
 from email.mime.text import MIMEText
 from email.mime.multipart import MIMEMultipart
 from datetime import datetime
+from typing import Callable, List, Optional, Tuple
+import base64
+import contextvars
+import html
 import os
+import time
 from dotenv import load_dotenv
+from app.log import Log
+from app.subscribers import Subscriber
+from app.tracing import Tracer
 
 load_dotenv()
 
+logger = Log.get_logger(__name__)
+
+# Placeholders filled in per recipient by EmailService._message_template
+_TO_MARKER = "recipient@template.invalid"
+_BODY_MARKER = "body"
+
 
 class EmailService:
     """Service to send email notifications"""
 
-    # Gmail SMTP settings
-    SMTP_SERVER = "smtp.gmail.com"
-    SMTP_PORT = 587
+    # SMTP settings (Gmail by default, override to point at a local sink)
+    SMTP_SERVER = os.getenv("SMTP_SERVER", "smtp.gmail.com")
+    SMTP_PORT = int(os.getenv("SMTP_PORT", "587"))
+    SMTP_USE_TLS = os.getenv("SMTP_USE_TLS", "true").lower() == "true"
+    # AUTH LOGIN with SENDER_EMAIL / SENDER_PASSWORD, on by default whenever TLS is
+    SMTP_USE_AUTH = os.getenv("SMTP_USE_AUTH", str(SMTP_USE_TLS)).lower() == "true"
 
     # Load credentials from environment variables
     SENDER_EMAIL = os.getenv("SENDER_EMAIL", "your_email@gmail.com")
     SENDER_PASSWORD = os.getenv("SENDER_PASSWORD", "your_app_password")
     RECIPIENT_EMAIL = os.getenv("RECIPIENT_EMAIL", "your_email@gmail.com")
 
+    # Topic fan-out: recipients per SMTP transaction (one RCPT TO each) and
+    # SMTP connections used in parallel
+    SMTP_MAX_RECIPIENTS = int(os.getenv("SMTP_MAX_RECIPIENTS", "100"))
+    FANOUT_CONNECTIONS = int(os.getenv("FANOUT_CONNECTIONS", "8"))
+
     @staticmethod
     def send_task_reminder_notification(
         task_name: str,
@@ -36,18 +59,22 @@ class EmailService:
             time_remaining: How much time is left
             notification_type: "15min", "5min", or "exact"
         """
-        try:
-            subject, body = EmailService._create_task_email(
-                task_name,
-                deadline,
-                time_remaining,
-                notification_type
-            )
-            EmailService._send_email(subject, body)
-            print(f"✅ Email sent: {task_name} - {notification_type}")
-
-        except Exception as e:
-            print(f"❌ Failed to send email: {str(e)}")
+        with Tracer.trace("send_task_reminder_notification", Tracer.KIND_INTERNAL) as span:
+            span.set_attribute("notification_type", notification_type)
+            try:
+                with Tracer.span("render"):
+                    subject, body = EmailService._create_task_email(
+                        task_name,
+                        deadline,
+                        time_remaining,
+                        notification_type
+                    )
+                EmailService._send_email(subject, body)
+                logger.info("email.sent", task=task_name, notification_type=notification_type)
+
+            except Exception as e:
+                span.set_attribute("error", str(e))
+                logger.error("email.failed", notification_type=notification_type, error=str(e))
 
     @staticmethod
     def send_fixed_reminder_notification(
@@ -63,21 +90,127 @@ class EmailService:
             time: Scheduled time
             notification_type: "15min", "5min", or "exact"
         """
-        try:
-            subject, body = EmailService._create_fixed_email(
-                title,
-                time,
-                notification_type
-            )
-            EmailService._send_email(subject, body)
-            print(f"✅ Email sent: {title} - {notification_type}")
+        with Tracer.trace("send_fixed_reminder_notification", Tracer.KIND_INTERNAL) as span:
+            span.set_attribute("notification_type", notification_type)
+            try:
+                with Tracer.span("render"):
+                    subject, body = EmailService._create_fixed_email(
+                        title,
+                        time,
+                        notification_type
+                    )
+                EmailService._send_email(subject, body)
+                logger.info("email.sent", title=title, notification_type=notification_type)
+
+            except Exception as e:
+                span.set_attribute("error", str(e))
+                logger.error("email.failed", notification_type=notification_type, error=str(e))
 
-        except Exception as e:
-            print(f"❌ Failed to send email: {str(e)}")
+    @staticmethod
+    def send_task_reminder_to_topic(
+        task_name: str,
+        deadline: str,
+        time_remaining: str,
+        notification_type: str,
+        topic: str,
+        subscribers: List[Subscriber]
+    ) -> dict:
+        """
+        Send a task reminder to every subscriber of a topic
+
+        Subscribers without a name share one rendered message, sent to up to
+        SMTP_MAX_RECIPIENTS of them per SMTP transaction. Named subscribers each
+        get a personalized message, rendered and sent concurrently. Both are
+        spread over FANOUT_CONNECTIONS connections that stay open for the whole
+        fan-out.
+
+        Args:
+            task_name: Name of the task
+            deadline: Deadline of the task
+            time_remaining: How much time is left
+            notification_type: "15min", "5min", or "exact"
+            topic: Topic the reminder targets
+            subscribers: Recipients, as subscribed when the notification fired
+
+        Returns:
+            Number of recipients sent to and failed, and SMTP transactions used
+        """
+        with Tracer.trace("send_task_reminder_to_topic", Tracer.KIND_INTERNAL) as span:
+            span.set_attribute("notification_type", notification_type)
+            span.set_attribute("recipients", len(subscribers))
+            started = time.perf_counter()
+            try:
+                jobs = []
+
+                # One message for everyone who doesn't need personalizing
+                shared = [subscriber.email for subscriber in subscribers if not subscriber.name]
+                if shared:
+                    with Tracer.span("render"):
+                        subject, body = EmailService._create_task_email(
+                            task_name,
+                            deadline,
+                            time_remaining,
+                            notification_type
+                        )
+                        shared_message = EmailService._build_message(subject, body, "undisclosed-recipients:;")
+                    step = EmailService.SMTP_MAX_RECIPIENTS
+                    jobs.extend(
+                        (shared[i:i + step], lambda: shared_message)
+                        for i in range(0, len(shared), step)
+                    )
+
+                # One message per named subscriber, rendered on the sending connection
+                personalized = [subscriber for subscriber in subscribers if subscriber.name]
+                if personalized:
+                    subject, _ = EmailService._create_task_email(task_name, deadline, time_remaining, notification_type)
+                    build_message = EmailService._message_template(subject)
+
+                    def render_personalized(subscriber: Subscriber) -> Callable[[], str]:
+                        def render():
+                            _, body = EmailService._create_task_email(
+                                task_name,
+                                deadline,
+                                time_remaining,
+                                notification_type,
+                                subscriber.name
+                            )
+                            return build_message(subscriber.email, body)
+                        return render
+
+                    jobs.extend(
+                        ([subscriber.email], render_personalized(subscriber))
+                        for subscriber in personalized
+                    )
+
+                sent, failed, transactions = EmailService._fan_out(jobs)
+                span.set_attribute("failed", failed)
+                logger.info(
+                    "email.fanout_sent",
+                    task=task_name,
+                    topic=topic,
+                    notification_type=notification_type,
+                    sent=sent,
+                    failed=failed,
+                    personalized=len(personalized),
+                    transactions=transactions,
+                    duration_ms=round((time.perf_counter() - started) * 1000, 1)
+                )
+                return {"sent": sent, "failed": failed, "transactions": transactions}
+
+            except Exception as e:
+                span.set_attribute("error", str(e))
+                logger.error("email.failed", topic=topic, notification_type=notification_type, error=str(e))
+                return {"sent": 0, "failed": len(subscribers), "transactions": 0}
 
     @staticmethod
-    def _create_task_email(task_name: str, deadline: str, time_remaining: str, notification_type: str):
-        """Create task reminder email"""
+    def _create_task_email(
+        task_name: str,
+        deadline: str,
+        time_remaining: str,
+        notification_type: str,
+        recipient_name: Optional[str] = None
+    ):
+        """Create task reminder email, greeting the recipient by name if given"""
 
         emoji_map = {
             "15min": "⏰ UPCOMING",
@@ -89,12 +222,17 @@ class EmailService:
 
         subject = f"{emoji} Reminder: {task_name}"
 
+        greeting = ""
+        if recipient_name:
+            # The name comes from the subscriber, not the sender: escape it
+            greeting = f'<p style="color: #333; font-size: 16px;">Hi {html.escape(recipient_name)},</p>'
+
         body = f"""
         <html>
             <body style="font-family: Arial, sans-serif; background-color: #f5f5f5; padding: 20px;">
                 <div style="background-color: white; border-radius: 10px; padding: 30px; max-width: 500px; margin: 0 auto; box-shadow: 0 2px 10px rgba(0,0,0,0.1);">
                     <h1 style="color: #667eea; text-align: center;">📝 Task Reminder</h1>
-                    
+                    {greeting}
                     <div style="background-color: #f9f9f9; padding: 20px; border-radius: 8px; border-left: 4px solid #667eea; margin: 20px 0;">
                         <h2 style="color: #333; margin: 0 0 10px 0;">{task_name}</h2>
                         <p style="color: #666; margin: 5px 0;"><strong>Deadline:</strong> {deadline}</p>
@@ -158,37 +296,131 @@ class EmailService:
 
         return subject, body
 
+    @staticmethod
+    def _build_message(subject: str, body: str, to: str) -> str:
+        """Build an HTML email as a string"""
+        message = MIMEMultipart("alternative")
+        message["Subject"] = subject
+        message["From"] = EmailService.SENDER_EMAIL
+        message["To"] = to
+
+        # Attach HTML
+        part = MIMEText(body, "html")
+        message.attach(part)
+        return message.as_string()
+
+    @staticmethod
+    def _message_template(subject: str) -> Callable[[str, str], str]:
+        """
+        Serialize the MIME structure of a message once
+
+        Returns a function (to, body) -> message string that only fills in the
+        recipient and the base64 HTML body, skipping the email package (~0.3 ms
+        per message) when sending many personalized copies.
+        """
+        message = MIMEMultipart("alternative")
+        message["Subject"] = subject
+        message["From"] = EmailService.SENDER_EMAIL
+        message["To"] = _TO_MARKER
+        message.attach(MIMEText(_BODY_MARKER, "html", "utf-8"))
+
+        head, _, rest = message.as_string().partition(_TO_MARKER)
+        middle, _, tail = rest.rpartition(base64.encodebytes(_BODY_MARKER.encode()).decode())
+
+        def build(to: str, body: str) -> str:
+            return head + to + middle + base64.encodebytes(body.encode()).decode() + tail
+
+        return build
+
+    @staticmethod
+    def _connect() -> smtplib.SMTP:
+        """Open an SMTP connection, with STARTTLS and login when enabled"""
+        with Tracer.span("smtp.connect"):
+            server = smtplib.SMTP(EmailService.SMTP_SERVER, EmailService.SMTP_PORT)
+        if EmailService.SMTP_USE_TLS:
+            with Tracer.span("smtp.starttls"):
+                server.starttls()
+        if EmailService.SMTP_USE_AUTH:
+            with Tracer.span("smtp.login"):
+                server.login(EmailService.SENDER_EMAIL, EmailService.SENDER_PASSWORD)
+        return server
+
     @staticmethod
     def _send_email(subject: str, body: str):
         """Send email via Gmail SMTP"""
 
         try:
             # Create message
-            message = MIMEMultipart("alternative")
-            message["Subject"] = subject
-            message["From"] = EmailService.SENDER_EMAIL
-            message["To"] = EmailService.RECIPIENT_EMAIL
-
-            # Attach HTML
-            part = MIMEText(body, "html")
-            message.attach(part)
+            with Tracer.span("smtp.build_message"):
+                raw_message = EmailService._build_message(subject, body, EmailService.RECIPIENT_EMAIL)
 
             # Send email
-            server = smtplib.SMTP(EmailService.SMTP_SERVER, EmailService.SMTP_PORT)
-            server.starttls()
-            server.login(EmailService.SENDER_EMAIL, EmailService.SENDER_PASSWORD)
-            server.sendmail(
-                EmailService.SENDER_EMAIL,
-                EmailService.RECIPIENT_EMAIL,
-                message.as_string()
-            )
-            server.quit()
+            server = EmailService._connect()
+            with Tracer.span("smtp.sendmail"):
+                server.sendmail(
+                    EmailService.SENDER_EMAIL,
+                    EmailService.RECIPIENT_EMAIL,
+                    raw_message
+                )
+            with Tracer.span("smtp.quit"):
+                server.quit()
 
             return True
 
         except Exception as e:
             raise Exception(f"Email sending failed: {str(e)}")
 
+    @staticmethod
+    def _fan_out(jobs: List[Tuple[List[str], Callable[[], str]]]) -> Tuple[int, int, int]:
+        """
+        Send (recipients, render) jobs over up to FANOUT_CONNECTIONS parallel connections
+
+        Returns:
+            (recipients sent to, recipients failed, SMTP transactions)
+        """
+        if not jobs:
+            return 0, 0, 0
+        connections = min(EmailService.FANOUT_CONNECTIONS, len(jobs))
+        shares = [jobs[i::connections] for i in range(connections)]
+        with ThreadPoolExecutor(max_workers=connections, thread_name_prefix="email-fanout") as pool:
+            # Run each connection in a copy of this context so its spans join the current trace
+            futures = [
+                pool.submit(contextvars.copy_context().run, EmailService._send_over_connection, share)
+                for share in shares
+            ]
+            results = [future.result() for future in futures]
+        sent, failed, transactions = (sum(counts) for counts in zip(*results))
+        return sent, failed, transactions
+
+    @staticmethod
+    def _send_over_connection(jobs: List[Tuple[List[str], Callable[[], str]]]) -> Tuple[int, int, int]:
+        """Send jobs one transaction each over a single connection"""
+        sent = failed = transactions = 0
+        server = None
+        try:
+            with Tracer.span("smtp.fanout_connection"):
+                server = EmailService._connect()
+                for recipients, render in jobs:
+                    try:
+                        refused = server.sendmail(EmailService.SENDER_EMAIL, recipients, render())
+                        sent += len(recipients) - len(refused)
+                        failed += len(refused)
+                    except (smtplib.SMTPRecipientsRefused, smtplib.SMTPDataError) as e:
+                        # Rejected by the server, the connection is still usable
+                        failed += len(recipients)
+                        logger.error("email.batch_failed", recipients=len(recipients), error=str(e))
+                    transactions += 1
+                server.quit()
+
+        except Exception as e:
+            # Connection lost: everything not sent on it has failed
+            failed = sum(len(recipients) for recipients, _ in jobs) - sent
+            logger.error("email.fanout_connection_failed", sent=sent, failed=failed, error=str(e))
+            if server is not None:
+                server.close()
+
+        return sent, failed, transactions
+
 
 # Test function
 def test_email():
@@ -0,0 +1,179 @@
+import atexit
+from datetime import datetime, timezone
+import json
+import os
+import queue
+import random
+import sys
+import threading
+import time
+import traceback
+
+from dotenv import load_dotenv
+
+load_dotenv()
+
+# Log levels
+DEBUG = 10
+INFO = 20
+WARNING = 30
+ERROR = 40
+
+LEVEL_NAMES = {DEBUG: "DEBUG", INFO: "INFO", WARNING: "WARNING", ERROR: "ERROR"}
+LEVELS = {name: level for level, name in LEVEL_NAMES.items()}
+
+
+class StructuredLogger:
+    """
+    Logger for one module; every call is an event name plus keyword fields
+
+    Usage:
+        logger.info("email.sent", task=task_name, notification_type="15min")
+        logger.error("email.failed", error=str(e), exc_info=True)
+    """
+
+    __slots__ = ("name",)
+
+    def __init__(self, name: str):
+        self.name = name
+
+    def debug(self, event: str, **fields):
+        if Log.LEVEL <= DEBUG:
+            Log._emit(DEBUG, self.name, event, fields)
+
+    def info(self, event: str, **fields):
+        if Log.LEVEL <= INFO:
+            Log._emit(INFO, self.name, event, fields)
+
+    def warning(self, event: str, **fields):
+        if Log.LEVEL <= WARNING:
+            Log._emit(WARNING, self.name, event, fields)
+
+    def error(self, event: str, **fields):
+        if Log.LEVEL <= ERROR:
+            Log._emit(ERROR, self.name, event, fields)
+
+
+class Log:
+    """
+    Queue-backed structured (JSON) logging
+
+    The calling thread only checks the level and sampling rate and puts a tuple
+    on a queue; a background writer thread formats one JSON object per line and
+    writes it. When the queue is full, events are dropped and counted instead of
+    blocking the caller. Configure with environment variables:
+
+    - LOG_LEVEL: minimum level, DEBUG / INFO / WARNING / ERROR (default INFO)
+    - LOG_QUEUE_SIZE: max events waiting for the writer (default 10000)
+    - LOG_SAMPLE_RATES: per-event sampling, e.g. "email.sent=0.1,notification.scheduled=0.01"
+    """
+
+    LEVEL = LEVELS.get(os.getenv("LOG_LEVEL", "INFO").upper(), INFO)
+    QUEUE_SIZE = int(os.getenv("LOG_QUEUE_SIZE", "10000"))
+    SAMPLE_RATES = {
+        event.strip(): float(rate)
+        for event, _, rate in (
+            item.partition("=") for item in os.getenv("LOG_SAMPLE_RATES", "").split(",") if item.strip()
+        )
+    }
+
+    dropped = 0
+
+    _queue = queue.SimpleQueue()
+    _stream = None
+    _writer = None
+    _lock = threading.Lock()
+    _dropped_lock = threading.Lock()
+    _STOP = object()
+
+    @staticmethod
+    def get_logger(name: str) -> StructuredLogger:
+        """Logger for a module, starting the writer thread on first use"""
+        Log.configure()
+        return StructuredLogger(name)
+
+    @staticmethod
+    def configure(stream=None):
+        """Start the writer thread (idempotent); stream defaults to stdout"""
+        with Log._lock:
+            if Log._writer is not None:
+                return
+            Log._stream = stream or sys.stdout
+            Log._writer = threading.Thread(target=Log._write_loop, name="log-writer", daemon=True)
+            Log._writer.start()
+            atexit.register(Log.shutdown)
+
+    @staticmethod
+    def shutdown():
+        """Write queued events and stop the writer thread"""
+        with Log._lock:
+            if Log._writer is None:
+                return
+            Log._queue.put(Log._STOP)
+            Log._writer.join()
+            Log._writer = None
+
+    @staticmethod
+    def flush():
+        """Block until every event queued so far has been written"""
+        if Log._writer is not None:
+            written = threading.Event()
+            Log._queue.put(written)
+            written.wait()
+
+    # ==================== CALLER SIDE ====================
+
+    @staticmethod
+    def _emit(level: int, name: str, event: str, fields: dict):
+        rate = Log.SAMPLE_RATES.get(event)
+        if rate is not None and random.random() >= rate:
+            return
+        if Log._queue.qsize() >= Log.QUEUE_SIZE:
+            # Callers drop concurrently from many threads; += alone is not atomic
+            with Log._dropped_lock:
+                Log.dropped += 1
+            return
+        exc_info = sys.exc_info() if fields.pop("exc_info", False) else None
+        Log._queue.put((time.time(), level, name, event, fields, exc_info))
+
+    # ==================== WRITER THREAD ====================
+
+    @staticmethod
+    def _format(created: float, level: int, name: str, event: str, fields: dict, exc_info) -> str:
+        entry = {
+            "ts": datetime.fromtimestamp(created, timezone.utc).isoformat(timespec="milliseconds"),
+            "level": LEVEL_NAMES[level],
+            "logger": name,
+            "event": event,
+        }
+        entry.update(fields)
+        if exc_info and exc_info[0] is not None:
+            entry["exception"] = "".join(traceback.format_exception(*exc_info))
+        return json.dumps(entry, ensure_ascii=False, default=str)
+
+    @staticmethod
+    def _write_loop():
+        reported = 0
+        while True:
+            item = Log._queue.get()
+            if item is Log._STOP:
+                Log._stream.flush()
+                return
+            if isinstance(item, threading.Event):
+                Log._stream.flush()
+                item.set()
+                continue
+
+            if Log.dropped != reported:
+                dropped = Log.dropped
+                Log._stream.write(Log._format(
+                    time.time(), WARNING, __name__, "log.dropped", {"dropped": dropped - reported, "dropped_total": dropped}, None
+                ) + "\n")
+                reported = dropped
+
+            try:
+                Log._stream.write(Log._format(*item) + "\n")
+                if Log._queue.empty():
+                    Log._stream.flush()
+            except Exception:
+                traceback.print_exc(file=sys.stderr)
@@ -1,5 +1,10 @@
-from datetime import datetime, timedelta
-from typing import List, Tuple
+from datetime import datetime, time, timedelta
+from itertools import islice
+from typing import List, Optional, Tuple
+import base64
+
+from app.clock import Clock
+from app.recurrence import Recurrence
 
 
 class ReminderLogic:
@@ -12,6 +17,9 @@ class ReminderLogic:
         "hard": 3
     }
 
+    # Notification times are stored as uint32 epoch seconds, which end in 2106
+    MAX_DEADLINE = datetime(2106, 1, 1)
+
     @staticmethod
     def parse_datetime(datetime_str: str) -> datetime:
         """Parse datetime string in format YYYY-MM-DD HH:MM"""
@@ -20,6 +28,13 @@ class ReminderLogic:
         except ValueError:
             raise ValueError(f"Invalid datetime format. Use: YYYY-MM-DD HH:MM")
 
+    @staticmethod
+    def validate_deadline(deadline: datetime) -> datetime:
+        """Check a deadline is early enough for its notifications to be scheduled"""
+        if deadline >= ReminderLogic.MAX_DEADLINE:
+            raise ValueError(f"Deadline must be before {ReminderLogic.format_datetime(ReminderLogic.MAX_DEADLINE)}")
+        return deadline
+
     @staticmethod
     def parse_time(time_str: str) -> Tuple[int, int]:
         """Parse time string in format HH:MM"""
@@ -31,6 +46,16 @@ class ReminderLogic:
         except ValueError:
             raise ValueError(f"Invalid time format. Use: HH:MM")
 
+    @staticmethod
+    def format_datetime(value: datetime) -> str:
+        """Format datetime as YYYY-MM-DD HH:MM (HH:MM:SS if it has seconds)"""
+        return value.isoformat(" ", "seconds" if value.second else "minutes")
+
+    @staticmethod
+    def format_time(value: time) -> str:
+        """Format time as HH:MM"""
+        return value.isoformat("minutes")
+
     @staticmethod
     def get_reminder_count(difficulty: str) -> int:
         """Get number of reminders based on difficulty level"""
@@ -74,7 +99,7 @@ class ReminderLogic:
         return total_score
 
     @staticmethod
-    def generate_task_reminders(deadline: datetime, difficulty: str) -> List[str]:
+    def generate_task_reminders(deadline: datetime, difficulty: str) -> List[datetime]:
         """
         Generate smart reminders based on deadline and difficulty
         
@@ -86,14 +111,14 @@ class ReminderLogic:
         reminder_count = ReminderLogic.get_reminder_count(difficulty)
         reminders = []
 
-        now = datetime.now()
+        now = Clock.now()
 
         if reminder_count == 1:
             # Easy: 1 day before
             reminder_time = deadline - timedelta(days=1)
             reminder_time = reminder_time.replace(hour=18, minute=0, second=0)
             if reminder_time > now:
-                reminders.append(reminder_time.strftime("%Y-%m-%d %H:%M"))
+                reminders.append(reminder_time)
 
         elif reminder_count == 2:
             # Medium: 3 days before + 1 day before
@@ -101,7 +126,7 @@ class ReminderLogic:
                 reminder_time = deadline - timedelta(days=days_before)
                 reminder_time = reminder_time.replace(hour=18, minute=0, second=0)
                 if reminder_time > now:
-                    reminders.append(reminder_time.strftime("%Y-%m-%d %H:%M"))
+                    reminders.append(reminder_time)
 
         elif reminder_count == 3:
             # Hard: 5 days before + 3 days before + 1 day before
@@ -109,43 +134,78 @@ class ReminderLogic:
                 reminder_time = deadline - timedelta(days=days_before)
                 reminder_time = reminder_time.replace(hour=18, minute=0, second=0)
                 if reminder_time > now:
-                    reminders.append(reminder_time.strftime("%Y-%m-%d %H:%M"))
+                    reminders.append(reminder_time)
 
         return reminders
 
     @staticmethod
-    def generate_fixed_reminders(
-        time_str: str, 
-        frequency: str, 
-        days_ahead: int = 3
-    ) -> List[str]:
+    def build_fixed_recurrence(
+        reminder_time: time,
+        frequency: str,
+        days_ahead: int = 3,
+        interval: int = 1,
+        rule: Optional[str] = None
+    ) -> Recurrence:
         """
-        Generate fixed-time reminders for medications/routines
-        
-        Current time is used as starting point
-        Generates reminders for specified number of days
+        Build the recurrence of a fixed-time reminder
+
+        Starts today at the given time and ends after `days_ahead` days:
+        - daily: every `interval` days
+        - weekly: every `interval` weeks
+        - custom: an RRULE such as FREQ=WEEKLY;BYDAY=MO,WE,FR
         """
-        hour, minute = ReminderLogic.parse_time(time_str)
-        reminders = []
+        today = datetime.combine(Clock.now().date(), datetime.min.time())
+        dtstart = datetime.combine(today.date(), reminder_time)
+        end = today + timedelta(days=days_ahead) - timedelta(seconds=1)
 
-        now = datetime.now()
-        start_date = now.date()
+        if frequency == "custom":
+            if not rule:
+                raise ValueError("Custom frequency requires an rrule, e.g. FREQ=WEEKLY;BYDAY=MO,WE,FR")
+            return Recurrence.from_rrule(rule, dtstart, end)
+        return Recurrence.every(frequency, dtstart, interval, end)
 
-        # Generate reminders for specified days ahead
-        for day_offset in range(days_ahead):
-            reminder_date = start_date + timedelta(days=day_offset)
-            reminder_time = datetime.combine(reminder_date, datetime.min.time())
-            reminder_time = reminder_time.replace(hour=hour, minute=minute)
+    @staticmethod
+    def page_fixed_reminders(
+        recurrence: Recurrence,
+        cursor: Optional[str] = None,
+        limit: int = 50
+    ) -> Tuple[List[datetime], Optional[str]]:
+        """
+        Return one page of future reminders and the cursor of the next page
 
-            # Only add if reminder time is in future
-            if reminder_time > now:
-                reminders.append(reminder_time.strftime("%Y-%m-%d %H:%M"))
+        The cursor is opaque to clients; it encodes the last reminder returned.
+        """
+        after = ReminderLogic.decode_cursor(cursor) if cursor else Clock.now()
+        page = list(islice(recurrence.occurrences(after=after), limit + 1))
 
-        return reminders
+        next_cursor = None
+        if len(page) > limit:
+            page = page[:limit]
+            next_cursor = ReminderLogic.encode_cursor(page[-1])
+
+        return page, next_cursor
+
+    @staticmethod
+    def encode_cursor(reminder_time: datetime) -> str:
+        """Opaque pagination cursor for a reminder time"""
+        return base64.urlsafe_b64encode(reminder_time.isoformat().encode()).decode().rstrip("=")
+
+    @staticmethod
+    def decode_cursor(cursor: str) -> datetime:
+        """Reminder time encoded in a pagination cursor"""
+        try:
+            padded = cursor + "=" * (-len(cursor) % 4)
+            reminder_time = datetime.fromisoformat(base64.urlsafe_b64decode(padded).decode())
+        except ValueError:
+            raise ValueError("Invalid cursor")
+        # Reminder times are naive local times; an aware one can't be compared with them
+        if reminder_time.tzinfo is not None:
+            raise ValueError("Invalid cursor")
+        return reminder_time
 
     @staticmethod
     def calculate_days_remaining(deadline: datetime) -> int:
         """Calculate days remaining until deadline"""
-        now = datetime.now()
+        now = Clock.now()
         days = (deadline.date() - now.date()).days
         return days
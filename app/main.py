@@ -1,19 +1,33 @@
-from fastapi import FastAPI, HTTPException
-from fastapi.responses import JSONResponse, FileResponse
+from fastapi import FastAPI, HTTPException, Header, Query, Request
+from fastapi.concurrency import run_in_threadpool
+from fastapi.exception_handlers import request_validation_exception_handler
+from fastapi.exceptions import RequestValidationError
+from fastapi.responses import JSONResponse, FileResponse, PlainTextResponse, ORJSONResponse
 from fastapi.openapi.utils import get_openapi
 from fastapi.staticfiles import StaticFiles
-from datetime import datetime
 from pathlib import Path
+from typing import Optional
+import hmac
+import os
 
 from app.schemas import (
     TaskReminderRequest, 
     TaskReminderResponse,
     FixedReminderRequest, 
-    FixedReminderResponse
+    FixedReminderResponse,
+    SubscribeRequest,
+    TopicSubscribersResponse
 )
+from app.clock import Clock
 from app.logic import ReminderLogic
 from app.scheduler import ReminderScheduler
+from app.subscribers import SubscriberRegistry
 from app.email_service import EmailService
+from app.log import Log
+from app.tracing import Tracer
+from app.profiler import SamplingProfiler
+
+logger = Log.get_logger(__name__)
 
 # Initialize FastAPI app
 app = FastAPI(
@@ -21,7 +35,8 @@ app = FastAPI(
     description="🌟 Intelligent reminder service for tasks, deadlines, and medications",
     version="1.0.0",
     docs_url="/docs",
-    redoc_url="/redoc"
+    redoc_url="/redoc",
+    default_response_class=ORJSONResponse
 )
 
 # Custom OpenAPI schema
@@ -53,19 +68,42 @@ if static_dir.exists():
     app.mount("/static", StaticFiles(directory=str(static_dir)), name="static")
 
 
+# ==================== ERROR HANDLING ====================
+
+@app.exception_handler(RequestValidationError)
+async def validation_exception_handler(request: Request, exc: RequestValidationError):
+    """Report bad deadline/time formats as 400 with a plain message, other validation errors as 422"""
+    for error in exc.errors():
+        if error["type"] == "value_error":
+            return ORJSONResponse(status_code=400, content={"detail": str(error["ctx"]["error"])})
+    return await request_validation_exception_handler(request, exc)
+
+
+# ==================== AUTH ====================
+
+def _require_admin(x_admin_token: Optional[str]):
+    """Raise unless the X-Admin-Token header matches the ADMIN_TOKEN environment variable"""
+    admin_token = os.getenv("ADMIN_TOKEN")
+    if not admin_token:
+        raise HTTPException(status_code=403, detail="Admin endpoints are disabled. Set ADMIN_TOKEN to enable them")
+    if not hmac.compare_digest(x_admin_token or "", admin_token):
+        raise HTTPException(status_code=401, detail="Invalid admin token")
+
+
 # ==================== STARTUP & SHUTDOWN ====================
 
 @app.on_event("startup")
 async def startup_event():
     """Initialize scheduler on app startup"""
     ReminderScheduler.start()
-    print("🚀 Application started with email notification support!")
+    logger.info("app.started")
 
 
 @app.on_event("shutdown")
 async def shutdown_event():
     """Stop scheduler on app shutdown"""
     ReminderScheduler.stop()
+    Tracer.flush()
 
 
 # ==================== ENDPOINTS ====================
@@ -81,13 +119,13 @@ async def health_check():
     """
     return {
         "status": "healthy",
-        "timestamp": datetime.now().isoformat(),
+        "timestamp": Clock.now().isoformat(),
         "message": "Smart Reminder Engine is running 🚀"
     }
 
 
 @app.post("/task-reminder", response_model=TaskReminderResponse, tags=["Smart Task Reminders"])
-async def create_task_reminder(request: TaskReminderRequest):
+async def create_task_reminder(request: TaskReminderRequest, x_admin_token: Optional[str] = Header(None)):
     """
     Generate intelligent reminders for tasks with deadlines.
     
@@ -115,52 +153,70 @@ async def create_task_reminder(request: TaskReminderRequest):
     - easy: 1 reminder
     - medium: 2 reminders
     - hard: 3 reminders
+
+    **Topics:** set `topic` to email every subscriber of the topic (see
+    `/topics/{topic}/subscribers`) instead of the default recipient.
+    Subscribers are looked up when each notification fires. Targeting a topic
+    requires the `X-Admin-Token` header.
     """
-    try:
-        # Parse and validate deadline
-        deadline = ReminderLogic.parse_datetime(request.deadline)
-        
-        # Validate difficulty
-        difficulty = request.difficulty.lower()
-        if difficulty not in ReminderLogic.DIFFICULTY_MAP:
-            raise HTTPException(
-                status_code=400,
-                detail=f"Invalid difficulty. Use: easy, medium, hard"
-            )
-        
-        # Generate reminders
-        reminders = ReminderLogic.generate_task_reminders(deadline, difficulty)
-        
-        # Calculate time pressure
-        days_remaining = ReminderLogic.calculate_days_remaining(deadline)
-        time_pressure_score = ReminderLogic.calculate_time_pressure_score(
-            days_remaining, 
-            difficulty
-        )
-        
-        # Schedule email notifications (15 min, 5 min, and exact time)
+    if request.topic is not None:
+        _require_admin(x_admin_token)
+
+    with Tracer.trace("POST /task-reminder") as span:
         try:
-            ReminderScheduler.schedule_task_reminder(
-                request.task,
-                request.deadline,
-                reminders
-            )
+            # Deadline is parsed once, by the request model
+            deadline = request.deadline
+
+            with Tracer.span("validate"):
+                # Validate difficulty
+                difficulty = request.difficulty.lower()
+                if difficulty not in ReminderLogic.DIFFICULTY_MAP:
+                    raise HTTPException(
+                        status_code=400,
+                        detail=f"Invalid difficulty. Use: easy, medium, hard"
+                    )
+            span.set_attribute("difficulty", difficulty)
+            if request.topic is not None:
+                span.set_attribute("topic", request.topic)
+
+            # Generate reminders
+            with Tracer.span("generate_task_reminders"):
+                reminders = ReminderLogic.generate_task_reminders(deadline, difficulty)
+
+                # Calculate time pressure
+                days_remaining = ReminderLogic.calculate_days_remaining(deadline)
+                time_pressure_score = ReminderLogic.calculate_time_pressure_score(
+                    days_remaining,
+                    difficulty
+                )
+
+            # Schedule email notifications (15 min, 5 min, and exact time)
+            with Tracer.span("schedule_task_reminder"):
+                try:
+                    ReminderScheduler.schedule_task_reminder(
+                        request.task,
+                        deadline,
+                        reminders,
+                        request.topic
+                    )
+                except Exception as e:
+                    logger.warning("email.schedule_failed", error=str(e))
+
+            with Tracer.span("serialize"):
+                return ORJSONResponse({
+                    "task": request.task,
+                    "deadline": ReminderLogic.format_datetime(deadline),
+                    "difficulty": difficulty,
+                    "reminders": [ReminderLogic.format_datetime(reminder) for reminder in reminders],
+                    "time_pressure_score": time_pressure_score,
+                    "days_remaining": days_remaining,
+                    "topic": request.topic
+                })
+
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
         except Exception as e:
-            print(f"⚠️ Warning: Could not schedule emails: {str(e)}")
-        
-        return TaskReminderResponse(
-            task=request.task,
-            deadline=request.deadline,
-            difficulty=difficulty,
-            reminders=reminders,
-            time_pressure_score=time_pressure_score,
-            days_remaining=days_remaining
-        )
-    
-    except ValueError as e:
-        raise HTTPException(status_code=400, detail=str(e))
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Internal error: {str(e)}")
+            raise HTTPException(status_code=500, detail=f"Internal error: {str(e)}")
 
 
 @app.post("/fixed-reminder", response_model=FixedReminderResponse, tags=["Fixed-Time Reminders"])
@@ -185,51 +241,139 @@ async def create_fixed_reminder(request: FixedReminderRequest):
     ```
     
     **Output includes:**
-    - List of next reminder times
+    - List of next reminder times (one page, up to `limit`)
     - Frequency information
+    - `next_cursor`: pass it back as `cursor` to get the next page (null on the last page)
     
     **Frequency Options:**
-    - daily (generates for specified days)
-    - weekly (can be extended in future)
-    - custom (can be extended in future)
+    - daily (every `interval` days, default 1)
+    - weekly (every `interval` weeks, default 1)
+    - custom (any RRULE in `rrule`, e.g. `FREQ=WEEKLY;BYDAY=MO,WE,FR`)
+    
+    Email notifications are scheduled on the first page request only, one
+    occurrence at a time up to `days_ahead` (max 3650). `custom` rules may repeat
+    at most once a minute.
     """
-    try:
-        # Validate frequency
-        frequency = request.frequency.lower()
-        if frequency not in ["daily", "weekly", "custom"]:
-            raise HTTPException(
-                status_code=400,
-                detail="Invalid frequency. Use: daily, weekly, custom"
-            )
-        
-        # Generate reminders
-        reminders = ReminderLogic.generate_fixed_reminders(
-            request.time,
-            frequency,
-            request.days_ahead
-        )
-        
-        # Schedule email notifications for fixed reminders
+    with Tracer.trace("POST /fixed-reminder") as span:
         try:
-            ReminderScheduler.schedule_fixed_reminder(
-                request.title,
-                request.time,
-                request.days_ahead
-            )
+            with Tracer.span("validate"):
+                # Validate frequency
+                frequency = request.frequency.lower()
+                if frequency not in ["daily", "weekly", "custom"]:
+                    raise HTTPException(
+                        status_code=400,
+                        detail="Invalid frequency. Use: daily, weekly, custom"
+                    )
+            span.set_attribute("days_ahead", request.days_ahead)
+
+            # Generate one page of reminders
+            with Tracer.span("generate_fixed_reminders"):
+                recurrence = ReminderLogic.build_fixed_recurrence(
+                    request.time,
+                    frequency,
+                    request.days_ahead,
+                    request.interval,
+                    request.rrule
+                )
+                reminders, next_cursor = ReminderLogic.page_fixed_reminders(
+                    recurrence,
+                    request.cursor,
+                    request.limit
+                )
+
+            # Schedule email notifications for fixed reminders (first page only)
+            if request.cursor is None:
+                with Tracer.span("schedule_fixed_reminder"):
+                    try:
+                        await run_in_threadpool(
+                            ReminderScheduler.schedule_fixed_reminder,
+                            request.title,
+                            request.time,
+                            request.days_ahead,
+                            recurrence
+                        )
+                    except Exception as e:
+                        logger.warning("email.schedule_failed", error=str(e))
+
+            with Tracer.span("serialize"):
+                return ORJSONResponse({
+                    "title": request.title,
+                    "time": ReminderLogic.format_time(request.time),
+                    "frequency": frequency,
+                    "next_reminders": [ReminderLogic.format_datetime(reminder) for reminder in reminders],
+                    "next_cursor": next_cursor
+                })
+
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
         except Exception as e:
-            print(f"⚠️ Warning: Could not schedule emails: {str(e)}")
-        
-        return FixedReminderResponse(
-            title=request.title,
-            time=request.time,
-            frequency=frequency,
-            next_reminders=reminders
-        )
-    
-    except ValueError as e:
-        raise HTTPException(status_code=400, detail=str(e))
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Internal error: {str(e)}")
+            raise HTTPException(status_code=500, detail=f"Internal error: {str(e)}")
+
+
+# ==================== TOPIC ENDPOINTS ====================
+
+@app.post("/topics/{topic}/subscribers", response_model=TopicSubscribersResponse, tags=["Topics"])
+async def subscribe(topic: str, request: SubscribeRequest, x_admin_token: Optional[str] = Header(None)):
+    """
+    Subscribe an email address to a topic (e.g. a class or a team).
+
+    Task reminders created with this `topic` go to every subscriber. Subscribers
+    with a `name` get a personalized email; everyone else shares one message sent
+    to many recipients per SMTP transaction. Subscribing again updates the name.
+
+    Topic endpoints require the `X-Admin-Token` header to match `ADMIN_TOKEN`.
+    """
+    _require_admin(x_admin_token)
+    SubscriberRegistry.subscribe(topic, request.email, request.name)
+    return _topic_subscribers(topic)
+
+
+@app.get("/topics/{topic}/subscribers", response_model=TopicSubscribersResponse, tags=["Topics"])
+async def list_subscribers(topic: str, x_admin_token: Optional[str] = Header(None)):
+    """List the subscribers of a topic"""
+    _require_admin(x_admin_token)
+    return _topic_subscribers(topic)
+
+
+@app.delete("/topics/{topic}/subscribers/{email}", response_model=TopicSubscribersResponse, tags=["Topics"])
+async def unsubscribe(topic: str, email: str, x_admin_token: Optional[str] = Header(None)):
+    """Remove an email address from a topic"""
+    _require_admin(x_admin_token)
+    if not SubscriberRegistry.unsubscribe(topic, email):
+        raise HTTPException(status_code=404, detail=f"{email} is not subscribed to {topic}")
+    return _topic_subscribers(topic)
+
+
+def _topic_subscribers(topic: str) -> ORJSONResponse:
+    subscribers = SubscriberRegistry.subscribers(topic)
+    return ORJSONResponse({
+        "topic": topic,
+        "count": len(subscribers),
+        "subscribers": [{"email": subscriber.email, "name": subscriber.name} for subscriber in subscribers]
+    })
+
+
+# ==================== ADMIN ENDPOINTS ====================
+
+@app.post("/admin/profile", response_class=PlainTextResponse, tags=["Admin"])
+async def profile(
+    seconds: float = Query(10, gt=0, le=SamplingProfiler.MAX_SECONDS, description="How long to sample for"),
+    interval_ms: float = Query(10, ge=1, description="Sampling interval in milliseconds"),
+    x_admin_token: Optional[str] = Header(None)
+):
+    """
+    Run the sampling profiler for a few seconds and return a flamegraph-ready profile.
+
+    Requires the `X-Admin-Token` header to match the `ADMIN_TOKEN` environment variable.
+    The response is in collapsed-stack format: feed it to `flamegraph.pl` or open it in
+    https://www.speedscope.app.
+    """
+    _require_admin(x_admin_token)
+
+    try:
+        return await run_in_threadpool(SamplingProfiler.run, seconds, interval_ms)
+    except RuntimeError as e:
+        raise HTTPException(status_code=409, detail=str(e))
 
 
 # ==================== ROOT ENDPOINT ====================
@@ -250,6 +394,7 @@ async def api_info():
             "health": "GET /health",
             "task_reminder": "POST /task-reminder",
             "fixed_reminder": "POST /fixed-reminder",
+            "topic_subscribers": "GET/POST /topics/{topic}/subscribers",
             "docs": "/docs (Swagger UI)",
             "redoc": "/redoc (ReDoc)"
         },
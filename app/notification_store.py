@@ -0,0 +1,272 @@
+from array import array
+from datetime import datetime
+import threading
+from typing import Iterator, List, Optional, Tuple
+
+
+# Notification kinds
+TASK = 1
+FIXED = 2
+
+# Notification types, in the order they are packed into the kind byte
+NOTIFICATION_TYPES = ("15min", "5min", "exact")
+_TYPE_CODES = {name: code for code, name in enumerate(NOTIFICATION_TYPES)}
+
+# Fire times are uint32 epoch seconds: 1970-01-01 to 2106-02-07 (UTC)
+MAX_FIRE_TS = 0xFFFFFFFF
+
+# Rows scanned per lock acquisition by remove()
+_REMOVE_CHUNK = 4096
+
+# Row returned by the store: (fire_at, kind, notification_type, name, detail, topic)
+Notification = Tuple[int, int, str, str, str, Optional[str]]
+
+
+class NotificationStore:
+    """
+    Compact store of pending notifications
+
+    Notifications are kept as parallel arrays (struct-of-arrays) rather than
+    one object each:
+
+    - fire_at:  uint32 epoch seconds
+    - name:     uint32 id of the interned task name / reminder title
+    - detail:   uint32 id of the interned deadline / time string
+    - topic:    uint32 id + 1 of the interned subscriber topic, 0 for none
+    - code:     uint8  kind (high nibble) and notification type (low nibble),
+                0 marks a free or cancelled row
+
+    A binary min-heap of row indices (uint32) orders rows by fire time.
+    Cancelled rows are left in the heap and skipped when they reach the top.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._reset()
+
+    def _reset(self):
+        self._fire_at = array("I")
+        self._name = array("I")
+        self._detail = array("I")
+        self._topic = array("I")
+        self._code = array("B")
+        self._free_rows = array("I")
+        self._heap = array("I")
+
+        # Interned strings with reference counts, ids are reused once freed
+        self._strings: List[Optional[str]] = []
+        self._string_ids = {}
+        self._string_refs = array("I")
+        self._free_strings = array("I")
+
+        self._count = 0
+
+    def __len__(self) -> int:
+        return self._count
+
+    # ==================== PUBLIC API ====================
+
+    def add(
+        self,
+        fire_at: datetime,
+        kind: int,
+        notification_type: str,
+        name: str,
+        detail: str,
+        topic: Optional[str] = None
+    ) -> bool:
+        """
+        Add a notification, sent to the topic's subscribers if a topic is given
+
+        Returns:
+            True if it is now the earliest pending notification
+
+        Raises:
+            ValueError: if fire_at is outside 1970-01-01 to 2106-02-07 (UTC)
+        """
+        code = (kind << 4) | _TYPE_CODES[notification_type]
+        fire_ts = int(fire_at.timestamp())
+        if not 0 <= fire_ts <= MAX_FIRE_TS:
+            raise ValueError(f"Fire time out of range: {fire_at}")
+
+        with self._lock:
+            name_id = self._intern(name)
+            detail_id = self._intern(detail)
+            topic_id = self._intern(topic) + 1 if topic is not None else 0
+
+            if self._free_rows:
+                row = self._free_rows.pop()
+                self._fire_at[row] = fire_ts
+                self._name[row] = name_id
+                self._detail[row] = detail_id
+                self._topic[row] = topic_id
+                self._code[row] = code
+            else:
+                row = len(self._code)
+                self._fire_at.append(fire_ts)
+                self._name.append(name_id)
+                self._detail.append(detail_id)
+                self._topic.append(topic_id)
+                self._code.append(code)
+
+            self._heap.append(row)
+            self._sift_up(len(self._heap) - 1)
+            self._count += 1
+            return self._heap[0] == row
+
+    def next_fire_time(self) -> Optional[int]:
+        """Epoch seconds of the earliest pending notification"""
+        with self._lock:
+            self._drop_cancelled()
+            return self._fire_at[self._heap[0]] if self._heap else None
+
+    def pop_due(self, now: float) -> List[Notification]:
+        """Remove and return every notification due at or before now"""
+        due = []
+        with self._lock:
+            while self._heap:
+                row = self._heap[0]
+                if self._code[row]:
+                    if self._fire_at[row] > now:
+                        break
+                    due.append(self._read(row))
+                    self._release(row)
+                self._pop_heap()
+        return due
+
+    def remove(self, predicate) -> int:
+        """
+        Cancel every notification for which predicate(notification) is true
+
+        Rows are scanned in chunks and predicate runs without the lock held, so
+        a scan over millions of rows doesn't stall dispatch or inserts.
+        """
+        removed = 0
+        start = 0
+        while True:
+            with self._lock:
+                end = min(start + _REMOVE_CHUNK, len(self._code))
+                chunk = [(row, self._read(row)) for row in range(start, end) if self._code[row]]
+            if start >= end:
+                return removed
+
+            matches = [(row, notification) for row, notification in chunk if predicate(notification)]
+            if matches:
+                with self._lock:
+                    for row, notification in matches:
+                        # Skip rows fired or reused since the snapshot
+                        if self._code[row] and self._read(row) == notification:
+                            self._release(row)
+                            removed += 1
+            start = end
+
+    def items(self) -> Iterator[Notification]:
+        """Iterate over pending notifications (unordered snapshot)"""
+        with self._lock:
+            rows = [self._read(row) for row in range(len(self._code)) if self._code[row]]
+        return iter(rows)
+
+    def clear(self):
+        """Drop every pending notification"""
+        with self._lock:
+            self._reset()
+
+    def nbytes(self) -> int:
+        """Bytes held by the column arrays (excluding interned strings)"""
+        arrays = (
+            self._fire_at, self._name, self._detail, self._topic, self._code,
+            self._free_rows, self._heap, self._string_refs, self._free_strings,
+        )
+        return sum(a.buffer_info()[1] * a.itemsize for a in arrays)
+
+    # ==================== ROWS & STRINGS ====================
+
+    def _read(self, row: int) -> Notification:
+        code = self._code[row]
+        return (
+            self._fire_at[row],
+            code >> 4,
+            NOTIFICATION_TYPES[code & 0x0F],
+            self._strings[self._name[row]],
+            self._strings[self._detail[row]],
+            self._strings[self._topic[row] - 1] if self._topic[row] else None,
+        )
+
+    def _release(self, row: int):
+        """Free a row; it stays in the heap until it reaches the top"""
+        self._code[row] = 0
+        self._unintern(self._name[row])
+        self._unintern(self._detail[row])
+        if self._topic[row]:
+            self._unintern(self._topic[row] - 1)
+        self._count -= 1
+
+    def _intern(self, value: str) -> int:
+        string_id = self._string_ids.get(value)
+        if string_id is None:
+            if self._free_strings:
+                string_id = self._free_strings.pop()
+                self._strings[string_id] = value
+                self._string_refs[string_id] = 0
+            else:
+                string_id = len(self._strings)
+                self._strings.append(value)
+                self._string_refs.append(0)
+            self._string_ids[value] = string_id
+        self._string_refs[string_id] += 1
+        return string_id
+
+    def _unintern(self, string_id: int):
+        self._string_refs[string_id] -= 1
+        if self._string_refs[string_id] == 0:
+            del self._string_ids[self._strings[string_id]]
+            self._strings[string_id] = None
+            self._free_strings.append(string_id)
+
+    # ==================== HEAP ====================
+
+    def _drop_cancelled(self):
+        while self._heap and not self._code[self._heap[0]]:
+            self._pop_heap()
+
+    def _pop_heap(self) -> int:
+        """Pop the heap top; freed rows become reusable once out of the heap"""
+        heap = self._heap
+        row = heap[0]
+        last = heap.pop()
+        if heap:
+            heap[0] = last
+            self._sift_down(0)
+        if not self._code[row]:
+            self._free_rows.append(row)
+        return row
+
+    def _sift_up(self, pos: int):
+        heap, fire_at = self._heap, self._fire_at
+        row = heap[pos]
+        key = fire_at[row]
+        while pos > 0:
+            parent = (pos - 1) >> 1
+            parent_row = heap[parent]
+            if fire_at[parent_row] <= key:
+                break
+            heap[pos] = parent_row
+            pos = parent
+        heap[pos] = row
+
+    def _sift_down(self, pos: int):
+        heap, fire_at = self._heap, self._fire_at
+        size = len(heap)
+        row = heap[pos]
+        key = fire_at[row]
+        while True:
+            child = 2 * pos + 1
+            if child >= size:
+                break
+            if child + 1 < size and fire_at[heap[child + 1]] < fire_at[heap[child]]:
+                child += 1
+            if fire_at[heap[child]] >= key:
+                break
+            heap[pos] = heap[child]
+            pos = child
+        heap[pos] = row
@@ -0,0 +1,63 @@
+from collections import Counter
+import sys
+import threading
+import time
+
+
+class SamplingProfiler:
+    """
+    Time-boxed sampling profiler
+
+    Samples the stack of every thread at a fixed interval and aggregates them
+    into collapsed stacks ("frame;frame;frame count" per line), the input
+    format of flamegraph.pl, speedscope and most flamegraph viewers.
+    Nothing runs unless a profile is requested.
+    """
+
+    MAX_SECONDS = 60
+    _lock = threading.Lock()
+
+    @staticmethod
+    def run(seconds: float, interval_ms: float = 10) -> str:
+        """
+        Profile all threads for the given duration
+
+        Raises:
+            RuntimeError: if another profile is already running
+        """
+        if not SamplingProfiler._lock.acquire(blocking=False):
+            raise RuntimeError("A profile is already running")
+
+        try:
+            seconds = min(seconds, SamplingProfiler.MAX_SECONDS)
+            interval = max(interval_ms, 1) / 1000
+            own_thread = threading.get_ident()
+            thread_names = {}
+            stacks = Counter()
+
+            deadline = time.monotonic() + seconds
+            while time.monotonic() < deadline:
+                if len(thread_names) != threading.active_count():
+                    thread_names = {thread.ident: thread.name for thread in threading.enumerate()}
+
+                for thread_id, frame in sys._current_frames().items():
+                    if thread_id == own_thread:
+                        continue
+                    stacks[SamplingProfiler._collapse(thread_names.get(thread_id, str(thread_id)), frame)] += 1
+                time.sleep(interval)
+
+            return "\n".join(f"{stack} {count}" for stack, count in stacks.most_common())
+        finally:
+            SamplingProfiler._lock.release()
+
+    @staticmethod
+    def _collapse(thread_name: str, frame) -> str:
+        """Root-first, semicolon separated stack for one thread"""
+        frames = []
+        while frame is not None:
+            code = frame.f_code
+            frames.append(f"{code.co_name} ({code.co_filename}:{code.co_firstlineno})")
+            frame = frame.f_back
+        frames.append(thread_name)
+        frames.reverse()
+        return ";".join(frame.replace(";", ":") for frame in frames)
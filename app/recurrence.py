@@ -0,0 +1,134 @@
+from calendar import isleap
+from datetime import date, datetime, timedelta, MAXYEAR
+from itertools import takewhile
+from typing import Iterator, Optional
+
+from dateutil.rrule import rrule, rrulestr, DAILY, WEEKLY, HOURLY, MINUTELY
+
+# Frequencies whose occurrence pattern repeats every `interval` periods
+_PERIODS = {
+    DAILY: timedelta(days=1),
+    WEEKLY: timedelta(weeks=1),
+    HOURLY: timedelta(hours=1),
+    MINUTELY: timedelta(minutes=1),
+}
+
+
+def _calendar_shift(first_year: int, last_year: int) -> int:
+    """
+    Most years that can be added to first_year..last_year with every year
+    landing on an identical calendar (same leap year, same weekday on Jan 1)
+    """
+    for shift in range(MAXYEAR - 1 - last_year, 0, -1):
+        if all(
+            isleap(year) == isleap(year + shift) and date(year, 1, 1).weekday() == date(year + shift, 1, 1).weekday()
+            for year in range(first_year, last_year + 1)
+        ):
+            return shift
+    return 0
+
+
+class Recurrence:
+    """
+    Lazy occurrences of an RRULE up to an end of horizon
+
+    Occurrences are produced on demand, never materialized. For rules that
+    repeat with a fixed period (DAILY / WEEKLY / HOURLY / MINUTELY without
+    COUNT) after() jumps straight to the period containing t instead of
+    iterating from DTSTART, so it costs the same for t next week or in 10 years.
+
+    dateutil only stops looking for the next occurrence when it finds one,
+    reaches COUNT or passes year 9999, so a rule that never matches
+    (FREQ=DAILY;BYMONTH=2;BYMONTHDAY=30) would scan thousands of years. With an end, the rule is
+    evaluated on the same calendar shifted as close to year 9999 as possible,
+    which bounds every scan to a few decades past the end.
+    """
+
+    def __init__(self, rule: rrule, end: Optional[datetime] = None):
+        self.start = rule._dtstart
+        self.end = end
+        self._shift = 0
+        self._period = None
+
+        if end is not None:
+            # The year before DTSTART and after the end shape week numbers
+            self._shift = _calendar_shift(self.start.year - 1, end.year + 1)
+            changes = {"dtstart": self._to_rule(self.start)}
+            if rule._count is None:
+                changes["until"] = self._to_rule(end if rule._until is None else min(rule._until, end))
+            rule = rule.replace(**changes)
+        self.rule = rule
+
+        if rule._count is None and rule._freq in _PERIODS:
+            self._period = _PERIODS[rule._freq] * rule._interval
+
+    @staticmethod
+    def from_rrule(rule_str: str, dtstart: datetime, end: Optional[datetime] = None) -> "Recurrence":
+        """Parse an RFC 5545 RRULE (e.g. FREQ=WEEKLY;BYDAY=MO,WE,FR), at most once a minute"""
+        try:
+            rule = rrulestr(rule_str, dtstart=dtstart)
+        except (ValueError, TypeError) as e:
+            raise ValueError(f"Invalid rrule: {str(e)}")
+
+        if not isinstance(rule, rrule):
+            raise ValueError("Invalid rrule: only a single RRULE is supported, without RDATE, EXDATE or EXRULE")
+        # Reminders start at the requested time; a DTSTART in the rule would override it
+        if rule._dtstart != dtstart:
+            raise ValueError("Invalid rrule: DTSTART is not supported, reminders start at the requested time")
+        if rule._freq > MINUTELY or len(rule._bysecond or ()) > 1:
+            raise ValueError("Invalid rrule: reminders can repeat at most once a minute")
+        return Recurrence(rule, end)
+
+    @staticmethod
+    def every(period: str, dtstart: datetime, interval: int = 1, end: Optional[datetime] = None) -> "Recurrence":
+        """Every `interval` days ("daily") or weeks ("weekly") from dtstart"""
+        freq = {"daily": DAILY, "weekly": WEEKLY}[period]
+        return Recurrence(rrule(freq, dtstart=dtstart, interval=interval), end)
+
+    def after(self, t: datetime, inclusive: bool = False) -> Optional[datetime]:
+        """First occurrence after t (at or after t if inclusive), None past the end"""
+        if self.end is not None and t > self.end:
+            return None
+        if t < self.start:
+            t, inclusive = self.start, True
+
+        rule = self.rule
+        t = self._to_rule(t)
+        if self._period is not None:
+            dtstart = rule._dtstart
+            if t > dtstart:
+                # Re-anchor on the last period boundary at or before t
+                periods = (t - dtstart) // self._period
+                rule = rule.replace(dtstart=dtstart + periods * self._period)
+
+        occurrence = rule.after(t, inc=inclusive)
+        if occurrence is None:
+            return None
+        occurrence = self._from_rule(occurrence)
+        if self.end is not None and occurrence > self.end:
+            return None
+        return occurrence
+
+    def occurrences(self, after: Optional[datetime] = None) -> Iterator[datetime]:
+        """Lazily iterate occurrences (strictly after `after`, if given) up to the end"""
+        if after is None:
+            occurrences = iter(self.rule)
+        else:
+            first = self.after(after)
+            if first is None:
+                return iter(())
+            first = self._to_rule(first)
+            occurrences = iter(self.rule.replace(dtstart=first) if self._period else self.rule.xafter(first, inc=True))
+
+        occurrences = map(self._from_rule, occurrences)
+        if self.end is None:
+            return occurrences
+        return takewhile(lambda occurrence: occurrence <= self.end, occurrences)
+
+    def _to_rule(self, value: datetime) -> datetime:
+        """A time on the calendar the rule is evaluated on"""
+        return value.replace(year=value.year + self._shift) if self._shift else value
+
+    def _from_rule(self, value: datetime) -> datetime:
+        """A time the rule produced, back on the real calendar"""
+        return value.replace(year=value.year - self._shift) if self._shift else value
@@ -1,11 +1,75 @@
-from apscheduler.schedulers.background import BackgroundScheduler
-from apscheduler.triggers.date import DateTrigger
-from datetime import datetime, timedelta
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, time as dt_time, timedelta
+from typing import Callable, Dict, Optional
+from app.clock import Clock
 from app.email_service import EmailService
+from app.log import Log
+from app.logic import ReminderLogic
+from app.notification_store import NotificationStore, TASK, FIXED
+from app.recurrence import Recurrence
+from app.subscribers import SubscriberRegistry
 import atexit
+import heapq
+import itertools
+import threading
 
-# Global scheduler instance
-scheduler = BackgroundScheduler()
+logger = Log.get_logger(__name__)
+
+# Global store of pending notifications
+store = NotificationStore()
+
+# Dispatcher state: one thread sleeps until the next fire time, sends run in a pool
+_wakeup = threading.Condition()
+_dispatcher = None
+_executor = None
+_running = False
+
+TIME_REMAINING = {
+    "15min": "15 minutes",
+    "5min": "5 minutes",
+    "exact": "NOW"
+}
+
+NOTIFICATION_OFFSETS = {
+    "15min": timedelta(minutes=15),
+    "5min": timedelta(minutes=5),
+    "exact": timedelta(0)
+}
+
+# Fixed reminders are scheduled lazily: each series keeps only its next
+# occurrence(s) in the store and is refilled from its recurrence shortly before
+# the following occurrence's first notification is due
+REFILL_LEAD = timedelta(minutes=1)
+_MAX_OFFSET = max(NOTIFICATION_OFFSETS.values())
+
+# Heap of (refill_ts, seq, FixedSeries), and every series with occurrences
+# still to come by id
+_series = []
+_fixed_series: Dict[str, "FixedSeries"] = {}
+_series_lock = threading.Lock()
+_series_seq = itertools.count()
+_series_ids = itertools.count(1)
+
+
+class FixedSeries:
+    """A fixed reminder's recurrence and its next occurrence not yet in the store"""
+
+    __slots__ = ("id", "title", "time_str", "recurrence", "pending", "stored", "cancelled")
+
+    def __init__(self, title: str, time_str: str, recurrence: Recurrence, pending: Optional[datetime]):
+        self.id = f"fixed_{title}_series_{next(_series_ids)}"
+        self.title = title
+        self.time_str = time_str
+        self.recurrence = recurrence
+        self.pending = pending
+        # Fire times this series has put in the store and that have not fired yet
+        self.stored = set()
+        self.cancelled = False
+
+    def owns(self, notification) -> bool:
+        """Whether a stored notification was added by this series"""
+        fire_ts, kind, _, name, detail, _ = notification
+        return kind == FIXED and name == self.title and detail == self.time_str and fire_ts in self.stored
 
 
 class ReminderScheduler:
@@ -13,149 +77,320 @@ class ReminderScheduler:
 
     @staticmethod
     def start():
-        """Start the background scheduler"""
-        if not scheduler.running:
-            scheduler.start()
-            atexit.register(lambda: scheduler.shutdown())
-            print("✅ Reminder scheduler started!")
+        """Start the background dispatcher"""
+        global _dispatcher, _executor, _running
+        if not _running:
+            _running = True
+            _executor = ThreadPoolExecutor(max_workers=10, thread_name_prefix="reminder-send")
+            _dispatcher = threading.Thread(target=ReminderScheduler._dispatch_loop, name="reminder-dispatch", daemon=True)
+            _dispatcher.start()
+            atexit.register(ReminderScheduler.stop)
+            logger.info("scheduler.started")
 
     @staticmethod
     def stop():
-        """Stop the background scheduler"""
-        if scheduler.running:
-            scheduler.shutdown()
-            print("✅ Reminder scheduler stopped!")
+        """Stop the background dispatcher"""
+        global _running
+        if _running:
+            with _wakeup:
+                _running = False
+                _wakeup.notify()
+            _dispatcher.join()
+            _executor.shutdown(wait=True)
+            logger.info("scheduler.stopped")
 
     @staticmethod
     def schedule_task_reminder(
         task_name: str,
-        deadline: str,
-        reminder_times: list
+        deadline: datetime,
+        reminder_times: list,
+        topic: Optional[str] = None
     ):
         """
         Schedule email notifications for task reminder
-        
+
         Args:
             task_name: Name of the task
-            deadline: Deadline datetime string
+            deadline: Deadline datetime
             reminder_times: List of reminder datetime objects
+            topic: Send to this topic's subscribers instead of RECIPIENT_EMAIL
         """
         try:
-            deadline_dt = datetime.strptime(deadline, "%Y-%m-%d %H:%M")
-
-            # Schedule 15 minutes before
-            time_15min_before = deadline_dt - timedelta(minutes=15)
-            if time_15min_before > datetime.now():
-                scheduler.add_job(
-                    EmailService.send_task_reminder_notification,
-                    args=(task_name, deadline, "15 minutes", "15min"),
-                    trigger=DateTrigger(run_date=time_15min_before),
-                    id=f"task_{task_name}_15min_{time_15min_before.timestamp()}"
-                )
-                print(f"⏰ Scheduled 15-min reminder for: {task_name}")
-
-            # Schedule 5 minutes before
-            time_5min_before = deadline_dt - timedelta(minutes=5)
-            if time_5min_before > datetime.now():
-                scheduler.add_job(
-                    EmailService.send_task_reminder_notification,
-                    args=(task_name, deadline, "5 minutes", "5min"),
-                    trigger=DateTrigger(run_date=time_5min_before),
-                    id=f"task_{task_name}_5min_{time_5min_before.timestamp()}"
-                )
-                print(f"⏰ Scheduled 5-min reminder for: {task_name}")
-
-            # Schedule at exact time
-            if deadline_dt > datetime.now():
-                scheduler.add_job(
-                    EmailService.send_task_reminder_notification,
-                    args=(task_name, deadline, "NOW", "exact"),
-                    trigger=DateTrigger(run_date=deadline_dt),
-                    id=f"task_{task_name}_exact_{deadline_dt.timestamp()}"
-                )
-                print(f"⏰ Scheduled exact reminder for: {task_name}")
+            deadline_str = ReminderLogic.format_datetime(deadline)
+            now = Clock.now()
+
+            # Schedule 15 minutes before, 5 minutes before and at exact time
+            for notification_type, offset in NOTIFICATION_OFFSETS.items():
+                fire_at = deadline - offset
+                if fire_at > now:
+                    ReminderScheduler._add(fire_at, TASK, notification_type, task_name, deadline_str, topic)
+                    logger.debug(
+                        "notification.scheduled",
+                        task=task_name,
+                        notification_type=notification_type,
+                        fire_at=fire_at,
+                        topic=topic
+                    )
 
         except Exception as e:
-            print(f"❌ Error scheduling task reminder: {str(e)}")
+            logger.error("task_reminder.schedule_failed", task=task_name, error=str(e))
 
     @staticmethod
     def schedule_fixed_reminder(
         title: str,
-        time: str,
-        days_ahead: int = 7
+        time: dt_time,
+        days_ahead: int = 7,
+        recurrence: Optional[Recurrence] = None
     ):
         """
         Schedule email notifications for fixed reminder
-        
+
+        Only the next occurrence goes into the store now; the one after it is
+        added from the recurrence as that one comes due.
+
         Args:
             title: Title of the reminder
-            time: Time in HH:MM format
+            time: Time of day
             days_ahead: Number of days to generate reminders for
+            recurrence: Occurrences to schedule, daily at `time` if not given
         """
         try:
-            hour, minute = map(int, time.split(":"))
-            now = datetime.now()
-            start_date = now.date()
-
-            # Schedule for each day
-            for day_offset in range(days_ahead):
-                reminder_date = start_date + timedelta(days=day_offset)
-                reminder_time = datetime.combine(reminder_date, datetime.min.time())
-                reminder_time = reminder_time.replace(hour=hour, minute=minute)
-
-                if reminder_time > now:
-                    # Schedule 15 minutes before
-                    time_15min_before = reminder_time - timedelta(minutes=15)
-                    if time_15min_before > now:
-                        scheduler.add_job(
-                            EmailService.send_fixed_reminder_notification,
-                            args=(title, time, "15min"),
-                            trigger=DateTrigger(run_date=time_15min_before),
-                            id=f"fixed_{title}_{reminder_date}_15min_{time_15min_before.timestamp()}"
-                        )
-
-                    # Schedule 5 minutes before
-                    time_5min_before = reminder_time - timedelta(minutes=5)
-                    if time_5min_before > now:
-                        scheduler.add_job(
-                            EmailService.send_fixed_reminder_notification,
-                            args=(title, time, "5min"),
-                            trigger=DateTrigger(run_date=time_5min_before),
-                            id=f"fixed_{title}_{reminder_date}_5min_{time_5min_before.timestamp()}"
-                        )
-
-                    # Schedule at exact time
-                    scheduler.add_job(
-                        EmailService.send_fixed_reminder_notification,
-                        args=(title, time, "exact"),
-                        trigger=DateTrigger(run_date=reminder_time),
-                        id=f"fixed_{title}_{reminder_date}_exact_{reminder_time.timestamp()}"
-                    )
+            if recurrence is None:
+                recurrence = ReminderLogic.build_fixed_recurrence(time, "daily", days_ahead)
+            time_str = ReminderLogic.format_time(time)
+            now = Clock.now()
+
+            series = FixedSeries(title, time_str, recurrence, recurrence.after(now))
+            with _series_lock:
+                _fixed_series[series.id] = series
+            ReminderScheduler._refill(series, now)
 
-            print(f"⏰ Scheduled fixed reminder for: {title} at {time} for {days_ahead} days")
+            logger.debug("fixed_reminder.scheduled", title=title, time=time_str, days_ahead=days_ahead, series=series.id)
 
         except Exception as e:
-            print(f"❌ Error scheduling fixed reminder: {str(e)}")
+            logger.error("fixed_reminder.schedule_failed", title=title, error=str(e))
 
     @staticmethod
     def get_scheduled_jobs():
-        """Get list of all scheduled jobs"""
+        """
+        Get list of all scheduled jobs
+
+        Every pending notification is a job, and so is every fixed reminder
+        series with occurrences not yet in the store; the series job runs
+        when the first notification of its next occurrence fires.
+        """
         jobs = []
-        for job in scheduler.get_jobs():
+        for notification in store.items():
+            next_run_time = datetime.fromtimestamp(notification[0])
             jobs.append({
-                "id": job.id,
-                "next_run_time": str(job.next_run_time),
-                "trigger": str(job.trigger)
+                "id": ReminderScheduler._job_id(notification),
+                "next_run_time": next_run_time,
+                "trigger": f"date[{next_run_time}]"
             })
+        with _series_lock:
+            series_list = list(_fixed_series.values())
+        for series in series_list:
+            pending = series.pending
+            if pending is not None:
+                jobs.append({
+                    "id": series.id,
+                    "next_run_time": pending - _MAX_OFFSET,
+                    "trigger": f"recurrence[{series.time_str}, until={series.recurrence.end}]"
+                })
+
+        jobs.sort(key=lambda job: job["next_run_time"])
+        for job in jobs:
+            job["next_run_time"] = str(job["next_run_time"])
         return jobs
 
     @staticmethod
     def remove_job(job_id: str):
-        """Remove a scheduled job"""
+        """Remove a scheduled job; a fixed reminder series id cancels the whole series"""
         try:
-            scheduler.remove_job(job_id)
-            print(f"✅ Removed job: {job_id}")
+            if ReminderScheduler._cancel_series(job_id):
+                removed = True
+            else:
+                removed = store.remove(lambda notification: ReminderScheduler._job_id(notification) == job_id)
+            if not removed:
+                raise KeyError(f"No job by the id of {job_id} was found")
+            logger.info("job.removed", job_id=job_id)
             return True
         except Exception as e:
-            print(f"❌ Error removing job: {str(e)}")
+            logger.error("job.remove_failed", job_id=job_id, error=str(e))
             return False
+
+    @staticmethod
+    def replay(until: datetime, deliver: Optional[Callable] = None) -> int:
+        """
+        Fire everything due up to `until` on the virtual clock, in the calling thread
+
+        Jumps the clock from one due batch to the next instead of waiting, so
+        days of reminders replay in seconds. The background dispatcher should
+        not be running at the same time.
+
+        Args:
+            until: Replay up to and including this time
+            deliver: Called with each due notification, in fire order
+                (defaults to sending the email)
+
+        Returns:
+            Number of notifications fired
+        """
+        clock = Clock.get()
+        if not Clock.is_virtual():
+            raise RuntimeError("replay needs a virtual clock, e.g. Clock.use(VirtualClock(start))")
+        deliver = deliver or ReminderScheduler._deliver
+        until_ts = until.timestamp()
+        fired = 0
+
+        while True:
+            next_wakeup = ReminderScheduler._next_wakeup()
+            if next_wakeup is None or next_wakeup > until_ts:
+                break
+            clock.advance_to(next_wakeup)
+            ReminderScheduler._refill_due(next_wakeup)
+            for notification in store.pop_due(next_wakeup):
+                deliver(notification)
+                fired += 1
+
+        clock.advance_to(until_ts)
+        return fired
+
+    @staticmethod
+    def clear():
+        """Drop every pending notification and fixed reminder series"""
+        with _series_lock:
+            _series.clear()
+            _fixed_series.clear()
+        store.clear()
+
+    # ==================== DISPATCH ====================
+
+    @staticmethod
+    def _add(
+        fire_at: datetime,
+        kind: int,
+        notification_type: str,
+        name: str,
+        detail: str,
+        topic: Optional[str] = None
+    ):
+        """Store a notification and wake the dispatcher if it is the new earliest one"""
+        if store.add(fire_at, kind, notification_type, name, detail, topic):
+            with _wakeup:
+                _wakeup.notify()
+
+    @staticmethod
+    def _refill(series: FixedSeries, now: datetime):
+        """Store every occurrence of a series whose notifications start before the next refill"""
+        horizon = now + _MAX_OFFSET + REFILL_LEAD
+        now_ts = now.timestamp()
+        series.stored = {fire_ts for fire_ts in series.stored if fire_ts >= now_ts}
+        while series.pending is not None and series.pending <= horizon:
+            # Schedule 15 minutes before, 5 minutes before and at exact time
+            for notification_type, offset in NOTIFICATION_OFFSETS.items():
+                fire_at = series.pending - offset
+                if fire_at > now:
+                    ReminderScheduler._add(fire_at, FIXED, notification_type, series.title, series.time_str)
+                    series.stored.add(int(fire_at.timestamp()))
+            series.pending = series.recurrence.after(series.pending)
+
+        earliest = False
+        with _series_lock:
+            cancelled = series.cancelled
+            if cancelled or series.pending is None:
+                _fixed_series.pop(series.id, None)
+            else:
+                refill_ts = (series.pending - _MAX_OFFSET - REFILL_LEAD).timestamp()
+                heapq.heappush(_series, (refill_ts, next(_series_seq), series))
+                earliest = _series[0][2] is series
+
+        if cancelled:
+            # Cancelled while refilling: take back what was just stored
+            store.remove(series.owns)
+        elif earliest:
+            with _wakeup:
+                _wakeup.notify()
+
+    @staticmethod
+    def _cancel_series(series_id: str) -> bool:
+        """Cancel a fixed reminder series and its notifications already in the store"""
+        with _series_lock:
+            series = _fixed_series.pop(series_id, None)
+            if series is None:
+                return False
+            series.cancelled = True
+            _series[:] = [entry for entry in _series if entry[2] is not series]
+            heapq.heapify(_series)
+        store.remove(series.owns)
+        return True
+
+    @staticmethod
+    def _refill_due(now_ts: float):
+        """Refill every series whose next occurrence is coming up"""
+        while True:
+            with _series_lock:
+                if not _series or _series[0][0] > now_ts:
+                    return
+                refill_ts, _, series = heapq.heappop(_series)
+            # Refill as of when it was due, so a late wakeup still stores (and
+            # delivers late) the notifications that came due in between
+            ReminderScheduler._refill(series, datetime.fromtimestamp(refill_ts))
+
+    @staticmethod
+    def _next_wakeup() -> Optional[float]:
+        """Epoch seconds of the next notification or series refill, whichever is first"""
+        next_fire = store.next_fire_time()
+        with _series_lock:
+            next_refill = _series[0][0] if _series else None
+        if next_fire is None or next_refill is None:
+            return next_refill if next_fire is None else next_fire
+        return min(next_fire, next_refill)
+
+    @staticmethod
+    def _dispatch_loop():
+        """Sleep until the earliest notification or refill is due, then hand due notifications to the send pool"""
+        while True:
+            with _wakeup:
+                if not _running:
+                    return
+                next_wakeup = ReminderScheduler._next_wakeup()
+                if next_wakeup is None or next_wakeup > Clock.time():
+                    Clock.wait_until(_wakeup, next_wakeup)
+                    continue
+
+            now = Clock.time()
+            ReminderScheduler._refill_due(now)
+            for notification in store.pop_due(now):
+                _executor.submit(ReminderScheduler._deliver, notification)
+
+    @staticmethod
+    def _deliver(notification):
+        """Send one due notification"""
+        _, kind, notification_type, name, detail, topic = notification
+        if topic is not None:
+            # Fan out to whoever is subscribed now
+            subscribers = SubscriberRegistry.subscribers(topic)
+            if not subscribers:
+                logger.warning("topic.no_subscribers", task=name, topic=topic, notification_type=notification_type)
+                return
+            EmailService.send_task_reminder_to_topic(
+                name, detail, TIME_REMAINING[notification_type], notification_type, topic, subscribers
+            )
+        elif kind == TASK:
+            EmailService.send_task_reminder_notification(
+                name, detail, TIME_REMAINING[notification_type], notification_type
+            )
+        else:
+            EmailService.send_fixed_reminder_notification(name, detail, notification_type)
+
+    @staticmethod
+    def _job_id(notification) -> str:
+        """Job id in the same format APScheduler jobs used to have, plus the topic if any"""
+        fire_ts, kind, notification_type, name, _, topic = notification
+        if topic is not None:
+            return f"topic_{topic}_task_{name}_{notification_type}_{float(fire_ts)}"
+        if kind == TASK:
+            return f"task_{name}_{notification_type}_{float(fire_ts)}"
+        reminder_date = (datetime.fromtimestamp(fire_ts) + NOTIFICATION_OFFSETS[notification_type]).date()
+        return f"fixed_{name}_{reminder_date}_{notification_type}_{float(fire_ts)}"
@@ -1,13 +1,26 @@
-from pydantic import BaseModel, Field
-from typing import List
-from datetime import datetime
+from pydantic import BaseModel, Field, field_validator
+from typing import List, Optional
+from datetime import datetime, time as dt_time
+
+from app.logic import ReminderLogic
 
 
 class TaskReminderRequest(BaseModel):
     """Schema for Smart Task Reminder Request"""
     task: str = Field(..., description="Task name (e.g., Math Assignment)")
-    deadline: str = Field(..., description="Deadline in format: YYYY-MM-DD HH:MM")
+    deadline: datetime = Field(..., description="Deadline in format: YYYY-MM-DD HH:MM")
     difficulty: str = Field(..., description="Difficulty level: easy, medium, hard")
+    topic: Optional[str] = Field(None, description="Email the topic's subscribers instead of the default recipient")
+
+    @field_validator("deadline", mode="before")
+    @classmethod
+    def parse_deadline(cls, value):
+        """Parse the deadline once, at validation time"""
+        if isinstance(value, datetime):
+            return ReminderLogic.validate_deadline(value)
+        if not isinstance(value, str):
+            raise ValueError("Invalid datetime format. Use: YYYY-MM-DD HH:MM")
+        return ReminderLogic.validate_deadline(ReminderLogic.parse_datetime(value))
 
     class Config:
         json_schema_extra = {
@@ -27,14 +40,29 @@ class TaskReminderResponse(BaseModel):
     reminders: List[str]
     time_pressure_score: int
     days_remaining: int
+    topic: Optional[str] = None
 
 
 class FixedReminderRequest(BaseModel):
     """Schema for Fixed-Time Reminder Request"""
     title: str = Field(..., description="Reminder title (e.g., Take Paracetamol)")
-    time: str = Field(..., description="Time in HH:MM format (e.g., 17:00)")
+    time: dt_time = Field(..., description="Time in HH:MM format (e.g., 17:00)")
     frequency: str = Field(..., description="Frequency: daily, weekly, custom")
-    days_ahead: int = Field(3, description="Number of days to generate reminders for")
+    days_ahead: int = Field(3, ge=1, le=3650, description="Number of days to generate reminders for (max 3650)")
+    interval: int = Field(1, ge=1, description="Every N days (daily) or weeks (weekly)")
+    rrule: Optional[str] = Field(None, description="RRULE for custom frequency (e.g. FREQ=WEEKLY;BYDAY=MO,WE,FR)")
+    cursor: Optional[str] = Field(None, description="next_cursor from a previous response, to fetch the next page")
+    limit: int = Field(50, ge=1, le=500, description="Maximum number of reminders per page")
+
+    @field_validator("time", mode="before")
+    @classmethod
+    def parse_time(cls, value):
+        """Parse the time once, at validation time"""
+        if isinstance(value, dt_time):
+            return value
+        if not isinstance(value, str):
+            raise ValueError("Invalid time format. Use: HH:MM")
+        return dt_time(*ReminderLogic.parse_time(value))
 
     class Config:
         json_schema_extra = {
@@ -53,3 +81,31 @@ class FixedReminderResponse(BaseModel):
     time: str
     frequency: str
     next_reminders: List[str]
+    next_cursor: Optional[str] = None
+
+
+class SubscribeRequest(BaseModel):
+    """Schema for subscribing to a topic"""
+    email: str = Field(..., pattern=r"^[^@\s]+@[^@\s]+\.[^@\s]+$", description="Subscriber email address")
+    name: Optional[str] = Field(None, description="Subscriber name; named subscribers get personalized emails")
+
+    class Config:
+        json_schema_extra = {
+            "example": {
+                "email": "student@example.com",
+                "name": "Asha"
+            }
+        }
+
+
+class SubscriberResponse(BaseModel):
+    """One subscriber of a topic"""
+    email: str
+    name: Optional[str] = None
+
+
+class TopicSubscribersResponse(BaseModel):
+    """Schema for a topic's subscribers"""
+    topic: str
+    count: int
+    subscribers: List[SubscriberResponse]
@@ -0,0 +1,70 @@
+from typing import Dict, List, NamedTuple, Optional
+import threading
+
+
+class Subscriber(NamedTuple):
+    """A recipient of a topic's reminders; a name makes their emails personalized"""
+    email: str
+    name: Optional[str] = None
+
+
+# Global topic -> {email: Subscriber}, in subscription order
+_topics: Dict[str, Dict[str, Subscriber]] = {}
+_lock = threading.Lock()
+
+
+class SubscriberRegistry:
+    """
+    Subscribers grouped by topic (e.g. a class or a team)
+
+    A task reminder that targets a topic is sent to whoever is subscribed to
+    it when the notification fires, not when it was scheduled.
+    """
+
+    @staticmethod
+    def subscribe(topic: str, email: str, name: Optional[str] = None) -> bool:
+        """
+        Subscribe an email address to a topic
+
+        Args:
+            topic: Topic name
+            email: Recipient email address
+            name: Recipient name used to personalize the email (optional)
+
+        Returns:
+            True if newly subscribed, False if an existing subscription was updated
+        """
+        with _lock:
+            subscribers = _topics.setdefault(topic, {})
+            is_new = email not in subscribers
+            subscribers[email] = Subscriber(email, name)
+            return is_new
+
+    @staticmethod
+    def unsubscribe(topic: str, email: str) -> bool:
+        """Remove an email address from a topic; returns False if it was not subscribed"""
+        with _lock:
+            subscribers = _topics.get(topic)
+            if not subscribers or subscribers.pop(email, None) is None:
+                return False
+            if not subscribers:
+                del _topics[topic]
+            return True
+
+    @staticmethod
+    def subscribers(topic: str) -> List[Subscriber]:
+        """Snapshot of a topic's subscribers"""
+        with _lock:
+            return list(_topics.get(topic, {}).values())
+
+    @staticmethod
+    def topics() -> Dict[str, int]:
+        """Subscriber count per topic"""
+        with _lock:
+            return {topic: len(subscribers) for topic, subscribers in _topics.items()}
+
+    @staticmethod
+    def clear():
+        """Drop every topic"""
+        with _lock:
+            _topics.clear()
@@ -0,0 +1,208 @@
+from contextvars import ContextVar
+import atexit
+import json
+import os
+import queue
+import random
+import sys
+import threading
+import time
+import traceback
+from typing import Optional
+
+from dotenv import load_dotenv
+
+load_dotenv()
+
+
+class _NoopSpan:
+    """Returned when a request is not sampled; entering it costs nothing"""
+
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        return False
+
+    def set_attribute(self, key: str, value):
+        pass
+
+
+_NOOP_SPAN = _NoopSpan()
+
+# Span currently active in this thread / task, None when not sampled
+_current_span: ContextVar[Optional["Span"]] = ContextVar("current_span", default=None)
+
+
+class Span:
+    """A timed stage of a sampled trace"""
+
+    __slots__ = ("trace_id", "span_id", "parent_id", "name", "kind", "start_ns", "end_ns", "attributes", "error", "_token")
+
+    def __init__(self, name: str, trace_id: str, parent_id: Optional[str], kind: int):
+        self.trace_id = trace_id
+        self.span_id = f"{random.getrandbits(64):016x}"
+        self.parent_id = parent_id
+        self.name = name
+        self.kind = kind
+        self.start_ns = 0
+        self.end_ns = 0
+        self.attributes = {}
+        self.error = None
+        self._token = None
+
+    def set_attribute(self, key: str, value):
+        self.attributes[key] = value
+
+    def __enter__(self):
+        self._token = _current_span.set(self)
+        self.start_ns = time.time_ns()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.end_ns = time.time_ns()
+        if exc is not None:
+            self.error = f"{exc_type.__name__}: {exc}"
+        _current_span.reset(self._token)
+        Tracer._record(self)
+        return False
+
+    def to_otlp(self) -> dict:
+        """OTLP/JSON representation of the span"""
+        span = {
+            "traceId": self.trace_id,
+            "spanId": self.span_id,
+            "name": self.name,
+            "kind": self.kind,
+            "startTimeUnixNano": str(self.start_ns),
+            "endTimeUnixNano": str(self.end_ns),
+            "attributes": [
+                {"key": key, "value": _otlp_value(value)}
+                for key, value in self.attributes.items()
+            ],
+            "status": {"code": 2, "message": self.error} if self.error else {"code": 1},
+        }
+        if self.parent_id:
+            span["parentSpanId"] = self.parent_id
+        return span
+
+
+def _otlp_value(value) -> dict:
+    if isinstance(value, bool):
+        return {"boolValue": value}
+    if isinstance(value, int):
+        return {"intValue": str(value)}
+    if isinstance(value, float):
+        return {"doubleValue": value}
+    return {"stringValue": str(value)}
+
+
+class Tracer:
+    """
+    Sampled span instrumentation exported as OTLP-compatible JSON lines
+
+    Configure with environment variables:
+    - TRACE_SAMPLE_RATE: fraction of traces to record (0 disables tracing)
+    - TRACE_EXPORT_PATH: file that receives one OTLP/JSON export request per line
+
+    Finished spans are buffered and handed to a background writer thread in
+    batches, so the thread that closes a span (possibly the event loop) never
+    does file I/O.
+    """
+
+    SAMPLE_RATE = float(os.getenv("TRACE_SAMPLE_RATE", "0"))
+    EXPORT_PATH = os.getenv("TRACE_EXPORT_PATH", "traces.jsonl")
+    SERVICE_NAME = "smart-reminder-engine"
+    BATCH_SIZE = 512
+
+    # OTLP span kinds
+    KIND_INTERNAL = 1
+    KIND_SERVER = 2
+
+    _buffer = []
+    _lock = threading.Lock()
+    _queue = queue.SimpleQueue()
+    _writer = None
+
+    @staticmethod
+    def trace(name: str, kind: int = KIND_SERVER):
+        """
+        Start a new trace, subject to sampling
+
+        Returns a no-op span when tracing is disabled or the trace is not sampled.
+        """
+        if Tracer.SAMPLE_RATE <= 0 or random.random() >= Tracer.SAMPLE_RATE:
+            return _NOOP_SPAN
+        return Span(name, f"{random.getrandbits(128):032x}", None, kind)
+
+    @staticmethod
+    def span(name: str):
+        """Start a child span of the current span, no-op outside a sampled trace"""
+        parent = _current_span.get()
+        if parent is None:
+            return _NOOP_SPAN
+        return Span(name, parent.trace_id, parent.span_id, Tracer.KIND_INTERNAL)
+
+    @staticmethod
+    def flush():
+        """Export buffered spans and block until everything recorded so far is written"""
+        with Tracer._lock:
+            spans, Tracer._buffer = Tracer._buffer, []
+        if spans:
+            Tracer._enqueue(spans)
+        if Tracer._writer is not None:
+            written = threading.Event()
+            Tracer._queue.put(written)
+            written.wait()
+
+    @staticmethod
+    def _record(span: Span):
+        with Tracer._lock:
+            Tracer._buffer.append(span)
+            if len(Tracer._buffer) < Tracer.BATCH_SIZE:
+                return
+            spans, Tracer._buffer = Tracer._buffer, []
+        Tracer._enqueue(spans)
+
+    # ==================== WRITER THREAD ====================
+
+    @staticmethod
+    def _enqueue(spans: list):
+        """Hand a batch to the writer thread, starting it on first use"""
+        if Tracer._writer is None:
+            with Tracer._lock:
+                if Tracer._writer is None:
+                    Tracer._writer = threading.Thread(target=Tracer._write_loop, name="trace-writer", daemon=True)
+                    Tracer._writer.start()
+                    atexit.register(Tracer.flush)
+        Tracer._queue.put(spans)
+
+    @staticmethod
+    def _write_loop():
+        while True:
+            item = Tracer._queue.get()
+            if isinstance(item, threading.Event):
+                item.set()
+                continue
+            try:
+                Tracer._write(item)
+            except Exception:
+                traceback.print_exc(file=sys.stderr)
+
+    @staticmethod
+    def _write(spans: list):
+        export = {
+            "resourceSpans": [{
+                "resource": {
+                    "attributes": [{"key": "service.name", "value": {"stringValue": Tracer.SERVICE_NAME}}]
+                },
+                "scopeSpans": [{
+                    "scope": {"name": "app.tracing"},
+                    "spans": [span.to_otlp() for span in spans]
+                }]
+            }]
+        }
+        with open(Tracer.EXPORT_PATH, "a", encoding="utf-8") as f:
+            f.write(json.dumps(export) + "\n")
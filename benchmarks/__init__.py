@@ -0,0 +1,2 @@
+# Benchmarks & Load Testing
+# Tools for measuring throughput, latency and delivery accuracy of the engine
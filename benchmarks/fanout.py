@@ -0,0 +1,128 @@
+"""
+Throughput of topic fan-out against the local SMTP sink
+
+Subscribes N recipients to a topic and sends one task reminder to all of them:
+
+- one per email:  the single-recipient path, a new connection and transaction
+                  per recipient (timed on a sample, then extrapolated)
+- shared:         no names, one message with up to SMTP_MAX_RECIPIENTS
+                  RCPT TO per transaction
+- personalized:   every subscriber named, one rendered message each, sent
+                  over FANOUT_CONNECTIONS connections
+- mixed:          half named, half not
+
+Each case is checked against what the sink received. Finally, a reminder for
+the topic is scheduled and replayed on a virtual clock through the real
+dispatch path. This checks that all three notifications (15min, 5min, exact)
+reach every subscriber.
+
+The sink runs in this process and shares the GIL with the sender, so the
+numbers are a lower bound.
+
+Usage:
+    python -m benchmarks.fanout --recipients 10000
+"""
+import argparse
+import os
+import time
+from datetime import datetime, timedelta
+
+os.environ.setdefault("LOG_LEVEL", "WARNING")
+
+from app.clock import Clock, VirtualClock  # noqa: E402
+from app.email_service import EmailService  # noqa: E402
+from app.scheduler import ReminderScheduler  # noqa: E402
+from app.subscribers import SubscriberRegistry  # noqa: E402
+from benchmarks.smtp_sink import SMTPSink  # noqa: E402
+
+TOPIC = "cs101"
+BASELINE_SAMPLE = 500
+
+
+def subscribe(count: int, named_every: int):
+    """Subscribe count recipients; every named_every-th one gets a name (0 for none)"""
+    SubscriberRegistry.clear()
+    for i in range(count):
+        name = f"Student {i}" if named_every and i % named_every == 0 else None
+        SubscriberRegistry.subscribe(TOPIC, f"student{i}@example.com", name)
+    return SubscriberRegistry.subscribers(TOPIC)
+
+
+def wait_for(sink: SMTPSink, recipients: int, timeout: float = 30):
+    deadline = time.time() + timeout
+    while sink.recipient_count() < recipients and time.time() < deadline:
+        time.sleep(0.01)
+
+
+def one_per_email(sink: SMTPSink, count: int) -> dict:
+    """The single-recipient path: a connection and a transaction per recipient"""
+    subject, body = EmailService._create_task_email("Assignment 3", "2025-01-15 23:59", "15 minutes", "15min")
+    started = time.perf_counter()
+    for i in range(count):
+        EmailService.RECIPIENT_EMAIL = f"student{i}@example.com"
+        EmailService._send_email(subject, body)
+    elapsed = time.perf_counter() - started
+    return {"sent": count, "failed": 0, "transactions": count, "seconds": elapsed}
+
+
+def topic_send(subscribers) -> dict:
+    started = time.perf_counter()
+    result = EmailService.send_task_reminder_to_topic(
+        "Assignment 3", "2025-01-15 23:59", "15 minutes", "15min", TOPIC, subscribers
+    )
+    result["seconds"] = time.perf_counter() - started
+    return result
+
+
+def replay_check(sink: SMTPSink, count: int) -> bool:
+    """Schedule a topic reminder and replay it through the dispatcher's deliver path"""
+    subscribers = subscribe(count, named_every=10)
+    start = datetime.now().replace(second=0, microsecond=0)
+    Clock.use(VirtualClock(start))
+    ReminderScheduler.schedule_task_reminder("Assignment 3", start + timedelta(hours=1), [], TOPIC)
+
+    before = sink.recipient_count()
+    ReminderScheduler.replay(start + timedelta(hours=2))
+    wait_for(sink, before + 3 * len(subscribers))
+    received = sink.recipient_count() - before
+    print(f"replay         3 notifications x {len(subscribers):,} subscribers -> {received:,} deliveries")
+    return received == 3 * len(subscribers)
+
+
+def main(recipients: int, port: int):
+    sink = SMTPSink(port=port).start()
+    EmailService.SMTP_SERVER, EmailService.SMTP_PORT = sink.address
+    EmailService.SMTP_USE_TLS = False
+    EmailService.SMTP_USE_AUTH = False
+
+    print(f"{'case':<16} {'recipients':>10} {'transactions':>12} {'seconds':>8} {'recipients/s':>13}")
+    ok = True
+    cases = [
+        ("one per email", lambda: one_per_email(sink, min(BASELINE_SAMPLE, recipients))),
+        ("shared", lambda: topic_send(subscribe(recipients, named_every=0))),
+        ("personalized", lambda: topic_send(subscribe(recipients, named_every=1))),
+        ("mixed", lambda: topic_send(subscribe(recipients, named_every=2))),
+    ]
+    for name, run in cases:
+        before = sink.recipient_count()
+        result = run()
+        wait_for(sink, before + result["sent"])
+        received = sink.recipient_count() - before
+        ok = ok and received == result["sent"] and result["failed"] == 0
+        print(
+            f"{name:<16} {result['sent']:>10,} {result['transactions']:>12,} "
+            f"{result['seconds']:>8.2f} {result['sent'] / result['seconds']:>13,.0f}"
+            f"{'' if received == result['sent'] else f'   sink received {received:,}'}"
+        )
+
+    ok = replay_check(sink, recipients) and ok
+    sink.stop()
+    raise SystemExit(0 if ok else 1)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark topic fan-out against a local SMTP sink")
+    parser.add_argument("--recipients", type=int, default=10000)
+    parser.add_argument("--port", type=int, default=8026)
+    args = parser.parse_args()
+    main(args.recipients, args.port)
@@ -0,0 +1,428 @@
+"""
+End-to-end load test for the reminder engine
+
+Starts the app under uvicorn with SMTP pointed at a local sink, floods
+POST /task-reminder and POST /fixed-reminder, then waits for the scheduled
+notifications to arrive and reports:
+
+- ingest throughput and latency per endpoint
+- CPU / RSS of the app process over time (Linux, read from /proc)
+- actual vs scheduled delivery time (fire lag) for every notification
+
+Usage:
+    python -m benchmarks.load_test --task-requests 5000 --fixed-requests 5000 --concurrency 32
+"""
+import argparse
+import http.client
+import json
+import os
+import random
+import subprocess
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Dict, List, Tuple
+
+from benchmarks.smtp_sink import SMTPSink
+
+ROOT_DIR = Path(__file__).parent.parent
+
+# Subject prefixes produced by EmailService → notification type
+SUBJECT_TYPES = {
+    "⏰ UPCOMING": "15min",
+    "🔔 HURRY UP": "5min",
+    "🎯 DUE NOW": "exact",
+    "🎯 TIME NOW": "exact",
+}
+
+NOTIFICATION_OFFSETS = {"15min": 15, "5min": 5, "exact": 0}
+
+
+# ==================== HELPERS ====================
+
+def percentile(values: List[float], pct: float) -> float:
+    """Nearest-rank percentile of an unsorted list"""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, int(round(pct / 100 * len(ordered))) - 1))
+    return ordered[index]
+
+
+def summarize(values: List[float]) -> Dict[str, float]:
+    """Min / percentiles / max / mean of a list of numbers"""
+    if not values:
+        return {"count": 0}
+    return {
+        "count": len(values),
+        "min": round(min(values), 3),
+        "p50": round(percentile(values, 50), 3),
+        "p90": round(percentile(values, 90), 3),
+        "p99": round(percentile(values, 99), 3),
+        "max": round(max(values), 3),
+        "mean": round(sum(values) / len(values), 3),
+    }
+
+
+def parse_weights(spec: str) -> Tuple[List[str], List[float]]:
+    """Parse 'easy=1,medium=2,hard=1' into choices and weights"""
+    choices, weights = [], []
+    for item in spec.split(","):
+        name, _, weight = item.partition("=")
+        choices.append(name.strip())
+        weights.append(float(weight or 1))
+    return choices, weights
+
+
+# ==================== APP PROCESS ====================
+
+def start_app(host: str, port: int, smtp_host: str, smtp_port: int) -> subprocess.Popen:
+    """Launch the app under uvicorn with SMTP pointed at the sink"""
+    env = dict(os.environ)
+    env.update({
+        "SMTP_SERVER": smtp_host,
+        "SMTP_PORT": str(smtp_port),
+        "SMTP_USE_TLS": "false",
+        "SMTP_USE_AUTH": "false",
+    })
+    return subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "app.main:app", "--host", host, "--port", str(port), "--log-level", "warning"],
+        cwd=str(ROOT_DIR),
+        env=env,
+        stdout=subprocess.DEVNULL,
+    )
+
+
+def wait_until_healthy(host: str, port: int, timeout: float = 30.0):
+    """Poll GET /health until the app answers"""
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        try:
+            connection = http.client.HTTPConnection(host, port, timeout=2)
+            connection.request("GET", "/health")
+            if connection.getresponse().status == 200:
+                connection.close()
+                return
+        except OSError:
+            pass
+        time.sleep(0.2)
+    raise RuntimeError(f"App did not become healthy on {host}:{port}")
+
+
+class ResourceMonitor:
+    """Samples CPU % and RSS of a process from /proc at a fixed interval"""
+
+    def __init__(self, pid: int, interval: float = 1.0):
+        self.pid = pid
+        self.interval = interval
+        self.samples = []
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._ticks = os.sysconf("SC_CLK_TCK")
+        self._page_size = os.sysconf("SC_PAGE_SIZE")
+
+    def _read(self) -> Tuple[float, int]:
+        with open(f"/proc/{self.pid}/stat") as f:
+            fields = f.read().rsplit(")", 1)[1].split()
+        cpu_seconds = (int(fields[11]) + int(fields[12])) / self._ticks
+        with open(f"/proc/{self.pid}/statm") as f:
+            rss_bytes = int(f.read().split()[1]) * self._page_size
+        return cpu_seconds, rss_bytes
+
+    def _run(self):
+        started = time.time()
+        last_wall, (last_cpu, _) = started, self._read()
+        while not self._stop.wait(self.interval):
+            try:
+                cpu, rss = self._read()
+            except OSError:
+                return
+            now = time.time()
+            self.samples.append({
+                "t": round(now - started, 2),
+                "cpu_percent": round((cpu - last_cpu) / (now - last_wall) * 100, 1),
+                "rss_mb": round(rss / 1024 / 1024, 1),
+            })
+            last_wall, last_cpu = now, cpu
+
+    def start(self):
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+        self._thread.join()
+
+
+# ==================== LOAD GENERATION ====================
+
+class Flood:
+    """Posts payloads to one endpoint with N keep-alive connections"""
+
+    def __init__(self, host: str, port: int, concurrency: int):
+        self.host = host
+        self.port = port
+        self.concurrency = concurrency
+        self._local = threading.local()
+
+    def _connection(self) -> http.client.HTTPConnection:
+        connection = getattr(self._local, "connection", None)
+        if connection is None:
+            connection = http.client.HTTPConnection(self.host, self.port, timeout=30)
+            self._local.connection = connection
+        return connection
+
+    def _post(self, path: str, payload: dict) -> Tuple[int, float, float]:
+        body = json.dumps(payload)
+        sent_at = time.time()
+        started = time.perf_counter()
+        try:
+            connection = self._connection()
+            connection.request("POST", path, body=body, headers={"Content-Type": "application/json"})
+            response = connection.getresponse()
+            response.read()
+            status = response.status
+        except (OSError, http.client.HTTPException):
+            self._local.connection = None
+            status = 0
+        return status, sent_at, (time.perf_counter() - started) * 1000
+
+    def run(self, path: str, payloads: List[dict]) -> Tuple[dict, List[Tuple[int, float]]]:
+        """Send every payload, return stats and (status, sent_at) per payload"""
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=self.concurrency) as pool:
+            results = list(pool.map(lambda payload: self._post(path, payload), payloads))
+        duration = time.perf_counter() - started
+
+        errors = sum(1 for status, _, _ in results if status != 200)
+        stats = {
+            "requests": len(payloads),
+            "errors": errors,
+            "duration_s": round(duration, 3),
+            "throughput_rps": round(len(payloads) / duration, 1) if duration else 0.0,
+            "latency_ms": summarize([latency for _, _, latency in results]),
+        }
+        return stats, [(status, sent_at) for status, sent_at, _ in results]
+
+
+def next_minute(now: datetime) -> datetime:
+    return (now + timedelta(minutes=1)).replace(second=0, microsecond=0)
+
+
+def deadline_minutes(count: int, window: int, distribution: str) -> List[int]:
+    """Minute offsets (from the next full minute) at which notifications should fire"""
+    if distribution == "burst":
+        return [0] * count
+    return [random.randrange(window) for _ in range(count)]
+
+
+def build_task_payloads(args, run_id: str, now: datetime) -> Tuple[List[dict], List[Dict[str, datetime]]]:
+    difficulties, weights = parse_weights(args.difficulty_mix)
+    base = next_minute(now) + timedelta(minutes=1)
+    payloads, fire_times = [], []
+    for i, offset in enumerate(deadline_minutes(args.task_requests, args.fire_window, args.distribution)):
+        deadline = base + timedelta(minutes=offset)
+        payloads.append({
+            "task": f"load-{run_id}-task-{i}",
+            "deadline": deadline.strftime("%Y-%m-%d %H:%M"),
+            "difficulty": random.choices(difficulties, weights)[0],
+        })
+        fire_times.append({
+            kind: deadline - timedelta(minutes=minutes)
+            for kind, minutes in NOTIFICATION_OFFSETS.items()
+        })
+    return payloads, fire_times
+
+
+def build_fixed_payloads(args, run_id: str, now: datetime) -> Tuple[List[dict], List[Dict[str, datetime]]]:
+    base = next_minute(now) + timedelta(minutes=1)
+    payloads, fire_times = [], []
+    for i, offset in enumerate(deadline_minutes(args.fixed_requests, args.fire_window, args.distribution)):
+        reminder_time = base + timedelta(minutes=offset)
+        payloads.append({
+            "title": f"load-{run_id}-fixed-{i}",
+            "time": reminder_time.strftime("%H:%M"),
+            "frequency": "daily",
+            # Two days so a window crossing midnight is still scheduled
+            "days_ahead": 2,
+        })
+        fire_times.append({
+            kind: reminder_time - timedelta(minutes=minutes)
+            for kind, minutes in NOTIFICATION_OFFSETS.items()
+        })
+    return payloads, fire_times
+
+
+def build_pending_payloads(count: int, run_id: str, now: datetime) -> List[dict]:
+    """Far-future reminders that stay pending for the whole run"""
+    return [
+        {
+            "task": f"load-{run_id}-pending-{i}",
+            "deadline": (now + timedelta(days=30, minutes=random.randrange(60 * 24 * 60))).strftime("%Y-%m-%d %H:%M"),
+            "difficulty": "hard",
+        }
+        for i in range(count)
+    ]
+
+
+def collect_expected(payloads, fire_times, results, name_key: str, window_end: datetime) -> Dict[Tuple[str, str], float]:
+    """Notifications the app should deliver before the end of the wait window"""
+    expected = {}
+    for payload, times, (status, sent_at) in zip(payloads, fire_times, results):
+        if status != 200:
+            continue
+        for kind, fire_at in times.items():
+            fire_ts = fire_at.timestamp()
+            if sent_at < fire_ts and fire_at <= window_end:
+                expected[(payload[name_key], kind)] = fire_ts
+    return expected
+
+
+def measure_delivery(sink: SMTPSink, expected: Dict[Tuple[str, str], float]) -> dict:
+    """Match received messages to expected notifications and compute fire lag"""
+    lags, unexpected, duplicates = [], 0, 0
+    seen = set()
+    for message in list(sink.messages):
+        prefix, _, name = message.subject.partition(" Reminder: ")
+        key = (name, SUBJECT_TYPES.get(prefix, "unknown"))
+        if key not in expected:
+            unexpected += 1
+            continue
+        if key in seen:
+            duplicates += 1
+            continue
+        seen.add(key)
+        lags.append((message.received_at - expected[key]) * 1000)
+
+    histogram = {}
+    for bucket_ms in (100, 250, 500, 1000, 2000, 5000, 10000, 30000):
+        histogram[f"<= {bucket_ms}ms"] = sum(1 for lag in lags if lag <= bucket_ms)
+    histogram["> 30000ms"] = sum(1 for lag in lags if lag > 30000)
+
+    return {
+        "expected": len(expected),
+        "delivered": len(seen),
+        "missing": len(expected) - len(seen),
+        "duplicates": duplicates,
+        "unexpected": unexpected,
+        "fire_lag_ms": summarize(lags),
+        "fire_lag_histogram": histogram,
+    }
+
+
+# ==================== MAIN ====================
+
+def run(args) -> dict:
+    run_id = f"{int(time.time())}"
+    sink = SMTPSink(args.smtp_host, args.smtp_port).start()
+    process = None
+    monitor = None
+
+    try:
+        if args.url:
+            host, _, port = args.url.replace("http://", "").partition(":")
+            port = int(port or 80)
+        else:
+            host, port = args.host, args.port
+            process = start_app(host, port, args.smtp_host, args.smtp_port)
+        wait_until_healthy(host, port)
+
+        pid = process.pid if process else args.pid
+        if pid:
+            monitor = ResourceMonitor(pid, args.sample_interval).start()
+
+        flood = Flood(host, port, args.concurrency)
+        report = {"config": vars(args), "ingest": {}}
+
+        if args.pending:
+            print(f"📦 Preloading {args.pending} pending reminders...")
+            stats, _ = flood.run("/task-reminder", build_pending_payloads(args.pending, run_id, datetime.now()))
+            report["ingest"]["pending_preload"] = stats
+
+        now = datetime.now()
+        task_payloads, task_fires = build_task_payloads(args, run_id, now)
+        fixed_payloads, fixed_fires = build_fixed_payloads(args, run_id, now)
+
+        print(f"🌊 Flooding /task-reminder with {len(task_payloads)} requests...")
+        task_stats, task_results = flood.run("/task-reminder", task_payloads)
+        report["ingest"]["task_reminder"] = task_stats
+
+        print(f"🌊 Flooding /fixed-reminder with {len(fixed_payloads)} requests...")
+        fixed_stats, fixed_results = flood.run("/fixed-reminder", fixed_payloads)
+        report["ingest"]["fixed_reminder"] = fixed_stats
+
+        window_end = next_minute(now) + timedelta(minutes=args.fire_window + 1)
+        expected = collect_expected(task_payloads, task_fires, task_results, "task", window_end)
+        expected.update(collect_expected(fixed_payloads, fixed_fires, fixed_results, "title", window_end))
+
+        wait_until = max(expected.values(), default=time.time()) + args.grace
+        print(f"⏳ Waiting for {len(expected)} notifications (until {datetime.fromtimestamp(wait_until):%H:%M:%S})...")
+        while time.time() < wait_until and sink.message_count() < len(expected):
+            time.sleep(0.5)
+
+        report["delivery"] = measure_delivery(sink, expected)
+    finally:
+        if monitor:
+            monitor.stop()
+        if process:
+            process.terminate()
+            process.wait(timeout=10)
+        sink.stop()
+
+    report["resources"] = monitor.samples if monitor else []
+    return report
+
+
+def print_summary(report: dict):
+    for name, stats in report["ingest"].items():
+        latency = stats["latency_ms"]
+        print(
+            f"📈 {name}: {stats['throughput_rps']} req/s, {stats['errors']} errors, "
+            f"latency p50={latency.get('p50')}ms p99={latency.get('p99')}ms"
+        )
+    delivery = report["delivery"]
+    lag = delivery["fire_lag_ms"]
+    print(
+        f"📬 delivered {delivery['delivered']}/{delivery['expected']} "
+        f"(missing {delivery['missing']}), fire lag p50={lag.get('p50')}ms "
+        f"p99={lag.get('p99')}ms max={lag.get('max')}ms"
+    )
+    if report["resources"]:
+        peak_rss = max(sample["rss_mb"] for sample in report["resources"])
+        peak_cpu = max(sample["cpu_percent"] for sample in report["resources"])
+        print(f"🖥️  peak RSS {peak_rss} MB, peak CPU {peak_cpu}%")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="End-to-end load test for the reminder engine")
+    parser.add_argument("--host", default="127.0.0.1", help="Host to launch the app on")
+    parser.add_argument("--port", type=int, default=8765, help="Port to launch the app on")
+    parser.add_argument("--url", help="Target an already running app instead of launching one")
+    parser.add_argument("--pid", type=int, help="PID of an already running app, for CPU/RSS sampling")
+    parser.add_argument("--smtp-host", default="127.0.0.1")
+    parser.add_argument("--smtp-port", type=int, default=8025)
+    parser.add_argument("--task-requests", type=int, default=1000)
+    parser.add_argument("--fixed-requests", type=int, default=1000)
+    parser.add_argument("--pending", type=int, default=0, help="Far-future reminders to preload before measuring")
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--fire-window", type=int, default=2, help="Minutes over which notifications are spread")
+    parser.add_argument("--distribution", choices=["uniform", "burst"], default="uniform",
+                        help="uniform: spread fire times over the window; burst: all in the same minute")
+    parser.add_argument("--difficulty-mix", default="easy=1,medium=1,hard=1")
+    parser.add_argument("--grace", type=float, default=30.0, help="Seconds to wait after the last expected fire time")
+    parser.add_argument("--sample-interval", type=float, default=1.0)
+    parser.add_argument("--report", help="Write the full JSON report to this file")
+    args = parser.parse_args()
+
+    report = run(args)
+    print_summary(report)
+    if args.report:
+        Path(args.report).write_text(json.dumps(report, indent=2, default=str))
+        print(f"📝 Report written to {args.report}")
+
+
+if __name__ == "__main__":
+    main()
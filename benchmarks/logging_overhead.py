@@ -0,0 +1,92 @@
+"""
+Cost of logging on the calling thread: print() vs the queue-backed JSON logger
+
+Scenarios:
+- print():          the old way, a synchronous write to stdout (here /dev/null)
+- log enqueued:     logger.info() handed to the writer thread
+- log below level:  logger.debug() with LOG_LEVEL=INFO
+- log sampled out:  an event listed in LOG_SAMPLE_RATES with rate 0
+- slow sink:        print() / logger.info() when every write takes 1 ms; the
+                    logger drops records instead of blocking
+
+Usage:
+    python -m benchmarks.logging_overhead
+"""
+import contextlib
+import os
+import time
+
+from app.log import Log, INFO
+
+CALLS = 100_000
+SLOW_CALLS = 2_000
+
+
+class SlowStream:
+    """A stream where every write takes a millisecond (a blocked pipe or slow disk)"""
+
+    def write(self, text):
+        time.sleep(0.001)
+
+    def flush(self):
+        pass
+
+
+def per_call_ns(fn, calls: int) -> float:
+    """Wall time per call on the calling thread, starting with an idle writer"""
+    Log.flush()
+    started = time.perf_counter_ns()
+    for i in range(calls):
+        fn(i)
+    return (time.perf_counter_ns() - started) / calls
+
+
+def main():
+    devnull = open(os.devnull, "w")
+
+    Log.LEVEL = INFO
+    Log.SAMPLE_RATES = {"bench.sampled": 0.0}
+    Log.QUEUE_SIZE = CALLS + 1
+    Log.configure(stream=devnull)
+    logger = Log.get_logger("bench")
+
+    with contextlib.redirect_stdout(devnull):
+        print_ns = per_call_ns(lambda i: print(f"✅ Email sent: Task {i} - 15min"), CALLS)
+
+    results = {
+        "print()": print_ns,
+        "log enqueued": per_call_ns(
+            lambda i: logger.info("email.sent", task=f"Task {i}", notification_type="15min"),
+            CALLS
+        ),
+        "log below level": per_call_ns(
+            lambda i: logger.debug("notification.scheduled", task=f"Task {i}"),
+            CALLS
+        ),
+        "log sampled out": per_call_ns(
+            lambda i: logger.info("bench.sampled", task=f"Task {i}"),
+            CALLS
+        ),
+    }
+    Log.shutdown()
+
+    # Slow sink: print blocks on every write, the logger fills its queue and drops
+    Log.QUEUE_SIZE = 1000
+    Log.configure(stream=SlowStream())
+    with contextlib.redirect_stdout(SlowStream()):
+        results["slow sink: print()"] = per_call_ns(lambda i: print(f"Task {i}"), SLOW_CALLS)
+    results["slow sink: log enqueued"] = per_call_ns(
+        lambda i: logger.info("email.sent", task=f"Task {i}"),
+        SLOW_CALLS
+    )
+    dropped = Log.dropped
+    Log.shutdown()
+
+    print(f"{'scenario':<26} {'ns/call':>12}")
+    for name, ns in results.items():
+        print(f"{name:<26} {ns:>12,.0f}")
+    print(f"slow sink: dropped {dropped} of {SLOW_CALLS} records (queue size {Log.QUEUE_SIZE})")
+
+
+if __name__ == "__main__":
+    main()
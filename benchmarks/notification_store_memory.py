@@ -0,0 +1,124 @@
+"""
+Bytes per pending notification: NotificationStore vs one APScheduler job each
+
+Each measurement runs in a fresh subprocess and reports the RSS growth divided
+by the number of notifications. The workload mirrors /task-reminder: every
+task contributes three notifications (15min, 5min, exact) sharing a name and
+a deadline string.
+
+The APScheduler baseline needs `pip install APScheduler==3.10.4`, which is no
+longer an app dependency.
+
+Usage:
+    python -m benchmarks.notification_store_memory --sizes 1000000,10000000 --baseline-max 1000000
+"""
+import argparse
+import gc
+import json
+import os
+import subprocess
+import sys
+import time
+from datetime import datetime, timedelta
+
+NOTIFICATION_TYPES = ("15min", "5min", "exact")
+OFFSETS = {"15min": timedelta(minutes=15), "5min": timedelta(minutes=5), "exact": timedelta(0)}
+
+
+def rss_bytes() -> int:
+    with open("/proc/self/statm") as f:
+        return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+
+
+def workload(count: int):
+    """Yield (fire_at, notification_type, task_name, deadline) for count notifications"""
+    start = datetime.now().replace(second=0, microsecond=0) + timedelta(days=1)
+    for i in range(count):
+        task = i // 3
+        deadline = start + timedelta(minutes=task % (60 * 24 * 365))
+        notification_type = NOTIFICATION_TYPES[i % 3]
+        yield deadline - OFFSETS[notification_type], notification_type, f"Task {task}", deadline.strftime("%Y-%m-%d %H:%M")
+
+
+def measure_store(count: int) -> dict:
+    from app.notification_store import NotificationStore, TASK
+
+    store = NotificationStore()
+    gc.collect()
+    before = rss_bytes()
+    started = time.perf_counter()
+    for fire_at, notification_type, name, deadline in workload(count):
+        store.add(fire_at, TASK, notification_type, name, deadline)
+    elapsed = time.perf_counter() - started
+    gc.collect()
+    return {
+        "rss_bytes": rss_bytes() - before,
+        "column_bytes": store.nbytes(),
+        "insert_seconds": elapsed,
+    }
+
+
+def measure_apscheduler(count: int) -> dict:
+    from apscheduler.schedulers.background import BackgroundScheduler
+    from apscheduler.triggers.date import DateTrigger
+
+    def send(*args):
+        pass
+
+    scheduler = BackgroundScheduler()
+    scheduler.start(paused=True)
+    gc.collect()
+    before = rss_bytes()
+    started = time.perf_counter()
+    for i, (fire_at, notification_type, name, deadline) in enumerate(workload(count)):
+        scheduler.add_job(
+            send,
+            args=(name, deadline, notification_type, notification_type),
+            trigger=DateTrigger(run_date=fire_at),
+            id=f"task_{name}_{notification_type}_{fire_at.timestamp()}_{i}"
+        )
+    elapsed = time.perf_counter() - started
+    gc.collect()
+    result = {"rss_bytes": rss_bytes() - before, "insert_seconds": elapsed}
+    scheduler.shutdown(wait=False)
+    return result
+
+
+def run_child(kind: str, count: int) -> dict:
+    output = subprocess.check_output(
+        [sys.executable, "-m", "benchmarks.notification_store_memory", "--child", kind, "--sizes", str(count)]
+    )
+    return json.loads(output)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure bytes per pending notification")
+    parser.add_argument("--sizes", default="1000000,10000000")
+    parser.add_argument("--baseline-max", type=int, default=1000000,
+                        help="Skip the APScheduler baseline above this many notifications")
+    parser.add_argument("--child", choices=["store", "apscheduler"], help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    sizes = [int(size) for size in args.sizes.split(",")]
+
+    if args.child:
+        measure = measure_store if args.child == "store" else measure_apscheduler
+        print(json.dumps(measure(sizes[0])))
+        return
+
+    print(f"{'impl':<12} {'notifications':>14} {'RSS MB':>10} {'bytes/notif':>12} {'insert s':>10}")
+    for count in sizes:
+        for kind in ("apscheduler", "store"):
+            if kind == "apscheduler" and count > args.baseline_max:
+                continue
+            result = run_child(kind, count)
+            print(
+                f"{kind:<12} {count:>14,} {result['rss_bytes'] / 1024 / 1024:>10.1f} "
+                f"{result['rss_bytes'] / count:>12.1f} {result['insert_seconds']:>10.1f}"
+            )
+            if "column_bytes" in result:
+                print(f"{'  columns':<12} {'':>14} {result['column_bytes'] / 1024 / 1024:>10.1f} "
+                      f"{result['column_bytes'] / count:>12.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,111 @@
+"""
+Replay days of reminders on a virtual clock in seconds
+
+Schedules task reminders with deadlines spread over the next N days through
+ReminderScheduler (three notifications each: 15min, 5min, exact). A daily
+medication reminder is scheduled alongside them. Then
+ReminderScheduler.replay() jumps the clock from one due batch to the next.
+Checks that:
+
+- every notification fires exactly once
+- it fires at its own fire time, in non-decreasing order
+- the medication reminder fires every day at 08:45, 08:55 and 09:00
+
+Usage:
+    python -m benchmarks.replay --notifications 1000000 --days 30
+"""
+import argparse
+import os
+import random
+import time
+from datetime import datetime, time as dt_time, timedelta
+
+os.environ.setdefault("LOG_LEVEL", "WARNING")
+
+from app.clock import Clock, VirtualClock  # noqa: E402
+from app.logic import ReminderLogic  # noqa: E402
+from app.notification_store import FIXED  # noqa: E402
+from app.scheduler import ReminderScheduler, store  # noqa: E402
+
+
+class Recorder:
+    """Delivery callback that checks fire times instead of sending email"""
+
+    def __init__(self, clock: VirtualClock):
+        self.clock = clock
+        self.fired = 0
+        self.batches = 0
+        self.late = 0
+        self.out_of_order = 0
+        self.medication = []
+        self._last = 0
+
+    def __call__(self, notification):
+        fire_ts, kind, notification_type, name, _, _ = notification
+        now = self.clock.time()
+        if now != fire_ts:
+            self.late += 1
+        if fire_ts < self._last:
+            self.out_of_order += 1
+        if fire_ts != self._last:
+            self.batches += 1
+            self._last = fire_ts
+        if kind == FIXED and name == "Medication":
+            self.medication.append(datetime.fromtimestamp(fire_ts))
+        self.fired += 1
+
+
+def main(notifications: int, days: int):
+    start = datetime.now().replace(second=0, microsecond=0)
+    clock = VirtualClock(start)
+    Clock.use(clock)
+
+    started = time.perf_counter()
+    for i in range(notifications // 3):
+        deadline = start + timedelta(minutes=random.randrange(16, days * 24 * 60))
+        ReminderScheduler.schedule_task_reminder(f"Task {i}", deadline, [])
+    recurrence = ReminderLogic.build_fixed_recurrence(dt_time(9, 0), "daily", days_ahead=days)
+    ReminderScheduler.schedule_fixed_reminder("Medication", dt_time(9, 0), days, recurrence)
+    schedule_seconds = time.perf_counter() - started
+
+    recorder = Recorder(clock)
+    started = time.perf_counter()
+    fired = ReminderScheduler.replay(start + timedelta(days=days), deliver=recorder)
+    replay_seconds = time.perf_counter() - started
+
+    expected_medication = [
+        datetime.combine(start.date() + timedelta(days=day), dt_time(9, 0)) - offset
+        for day in range(days)
+        for offset in (timedelta(minutes=15), timedelta(minutes=5), timedelta(0))
+    ]
+    expected_medication = [t for t in expected_medication if t > start]
+
+    # Fixed reminders enter the store one occurrence at a time
+    scheduled = 3 * (notifications // 3) + len(expected_medication)
+
+    print(f"scheduled      {scheduled:>12,} notifications over {days} days in {schedule_seconds:.1f}s")
+    print(f"replayed       {fired:>12,} notifications in {recorder.batches:,} batches in {replay_seconds:.1f}s "
+          f"({fired / replay_seconds:,.0f}/s, {days * 86400 / replay_seconds:,.0f}x real time)")
+    print(f"late           {recorder.late:>12,}")
+    print(f"out of order   {recorder.out_of_order:>12,}")
+    print(f"left in store  {len(store):>12,}")
+    print(f"medication     {'ok' if recorder.medication == expected_medication else 'MISMATCH'} "
+          f"({len(recorder.medication)} of {len(expected_medication)} fired on time)")
+    print(f"clock now      {Clock.now()}")
+
+    ok = (
+        fired == scheduled
+        and recorder.late == 0
+        and recorder.out_of_order == 0
+        and len(store) == 0
+        and recorder.medication == expected_medication
+    )
+    raise SystemExit(0 if ok else 1)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Replay scheduled reminders on a virtual clock")
+    parser.add_argument("--notifications", type=int, default=1_000_000)
+    parser.add_argument("--days", type=int, default=30)
+    args = parser.parse_args()
+    main(args.notifications, args.days)
@@ -0,0 +1,123 @@
+"""
+In-process latency and throughput of the two POST endpoints
+
+Drives the ASGI app directly (no sockets, no HTTP client) so the numbers
+cover only FastAPI routing, request validation, reminder logic, scheduling
+into the notification store and response serialization.
+
+Usage:
+    python -m benchmarks.request_pipeline --requests 20000
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import time
+from datetime import datetime, timedelta
+
+os.environ.setdefault("LOG_LEVEL", "WARNING")
+
+from app.main import app  # noqa: E402
+from app.scheduler import ReminderScheduler  # noqa: E402
+from benchmarks.load_test import summarize  # noqa: E402
+
+
+async def post(path: str, body: bytes) -> int:
+    """Run one POST through the ASGI app and return the status code"""
+    scope = {
+        "type": "http",
+        "asgi": {"version": "3.0"},
+        "http_version": "1.1",
+        "method": "POST",
+        "scheme": "http",
+        "path": path,
+        "raw_path": path.encode(),
+        "query_string": b"",
+        "root_path": "",
+        "headers": [(b"content-type", b"application/json"), (b"content-length", str(len(body)).encode())],
+        "client": ("127.0.0.1", 50000),
+        "server": ("127.0.0.1", 8000),
+    }
+    received = False
+    status = 0
+
+    async def receive():
+        nonlocal received
+        if not received:
+            received = True
+            return {"type": "http.request", "body": body, "more_body": False}
+        return {"type": "http.disconnect"}
+
+    async def send(message):
+        nonlocal status
+        if message["type"] == "http.response.start":
+            status = message["status"]
+
+    await app(scope, receive, send)
+    return status
+
+
+def task_bodies(count: int):
+    now = datetime.now()
+    return [
+        json.dumps({
+            "task": f"Task {i}",
+            "deadline": (now + timedelta(days=random.randint(1, 30), minutes=random.randrange(1440))).strftime("%Y-%m-%d %H:%M"),
+            "difficulty": random.choice(["easy", "medium", "hard"]),
+        }).encode()
+        for i in range(count)
+    ]
+
+
+def fixed_bodies(count: int):
+    return [
+        json.dumps({
+            "title": f"Reminder {i}",
+            "time": f"{random.randrange(24):02d}:{random.randrange(60):02d}",
+            "frequency": "daily",
+            "days_ahead": 7,
+        }).encode()
+        for i in range(count)
+    ]
+
+
+async def run(path: str, bodies) -> dict:
+    latencies = []
+    errors = 0
+    started = time.perf_counter()
+    for body in bodies:
+        request_started = time.perf_counter()
+        if await post(path, body) != 200:
+            errors += 1
+        latencies.append((time.perf_counter() - request_started) * 1_000_000)
+    duration = time.perf_counter() - started
+    return {
+        "requests": len(bodies),
+        "errors": errors,
+        "throughput_rps": round(len(bodies) / duration),
+        "latency_us": summarize(latencies),
+    }
+
+
+async def main(requests: int):
+    # Warm up routes and validators
+    await run("/task-reminder", task_bodies(200))
+    await run("/fixed-reminder", fixed_bodies(200))
+    ReminderScheduler.clear()
+
+    for path, bodies in (("/task-reminder", task_bodies(requests)), ("/fixed-reminder", fixed_bodies(requests))):
+        result = await run(path, bodies)
+        latency = result["latency_us"]
+        print(
+            f"{path:<16} {result['throughput_rps']:>7} req/s   "
+            f"p50 {latency['p50']:>7.1f} us   p99 {latency['p99']:>7.1f} us   errors {result['errors']}"
+        )
+        ReminderScheduler.clear()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="In-process benchmark of the POST endpoints")
+    parser.add_argument("--requests", type=int, default=20000)
+    args = parser.parse_args()
+    asyncio.run(main(args.requests))
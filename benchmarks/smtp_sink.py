@@ -0,0 +1,150 @@
+import socketserver
+import threading
+import time
+from email.header import decode_header, make_header
+from email.parser import BytesHeaderParser
+from typing import Iterable, List
+
+
+class ReceivedMessage:
+    """A message accepted by the sink, timestamped on receipt"""
+
+    __slots__ = ("received_at", "mail_from", "recipients", "subject", "size")
+
+    def __init__(self, received_at: float, mail_from: str, recipients: List[str], subject: str, size: int):
+        self.received_at = received_at
+        self.mail_from = mail_from
+        self.recipients = recipients
+        self.subject = subject
+        self.size = size
+
+
+class _SMTPHandler(socketserver.StreamRequestHandler):
+    """Speaks just enough SMTP for smtplib: EHLO/HELO, MAIL, RCPT, DATA, RSET, NOOP, QUIT"""
+
+    def _reply(self, line: str):
+        self.wfile.write(f"{line}\r\n".encode())
+
+    def handle(self):
+        sink = self.server.sink
+        mail_from = ""
+        recipients = []
+        self._reply("220 smtp-sink ready")
+
+        while True:
+            line = self.rfile.readline()
+            if not line:
+                return
+            command = line.decode("utf-8", "replace").strip()
+            verb = command[:4].upper()
+
+            if verb in ("EHLO", "HELO"):
+                self._reply("250 smtp-sink")
+            elif verb == "MAIL":
+                mail_from = command.split(":", 1)[1].strip().strip("<>")
+                recipients = []
+                self._reply("250 OK")
+            elif verb == "RCPT":
+                recipient = command.split(":", 1)[1].strip().strip("<>")
+                if recipient in sink.refuse:
+                    self._reply("550 No such user")
+                else:
+                    recipients.append(recipient)
+                    self._reply("250 OK")
+            elif verb == "DATA":
+                self._reply("354 End data with <CR><LF>.<CR><LF>")
+                chunks = []
+                while True:
+                    data_line = self.rfile.readline()
+                    if not data_line or data_line in (b".\r\n", b".\n"):
+                        break
+                    if data_line.startswith(b".."):
+                        data_line = data_line[1:]
+                    chunks.append(data_line)
+                received_at = time.time()
+                sink._record(received_at, mail_from, recipients, b"".join(chunks))
+                recipients = []
+                self._reply("250 OK: queued")
+            elif verb == "RSET":
+                mail_from = ""
+                recipients = []
+                self._reply("250 OK")
+            elif verb == "NOOP":
+                self._reply("250 OK")
+            elif verb == "QUIT":
+                self._reply("221 Bye")
+                return
+            else:
+                self._reply("502 Command not implemented")
+
+
+class _ThreadingSMTPServer(socketserver.ThreadingMixIn, socketserver.TCPServer):
+    allow_reuse_address = True
+    daemon_threads = True
+
+
+class SMTPSink:
+    """
+    Local SMTP server that accepts every message and timestamps it on receipt
+
+    Point the app at it with SMTP_SERVER / SMTP_PORT and SMTP_USE_TLS=false.
+    Addresses in `refuse` are rejected at RCPT TO, like unknown mailboxes.
+    """
+
+    def __init__(self, host: str = "127.0.0.1", port: int = 8025, refuse: Iterable[str] = ()):
+        self._server = _ThreadingSMTPServer((host, port), _SMTPHandler)
+        self._server.sink = self
+        self.refuse = set(refuse)
+        self._thread = None
+        self._lock = threading.Lock()
+        self.messages: List[ReceivedMessage] = []
+
+    @property
+    def address(self):
+        return self._server.server_address
+
+    def start(self):
+        """Start serving in a background thread"""
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        """Stop the server"""
+        self._server.shutdown()
+        self._server.server_close()
+
+    def message_count(self) -> int:
+        """Number of messages received so far"""
+        with self._lock:
+            return len(self.messages)
+
+    def recipient_count(self) -> int:
+        """Number of recipients across all received messages"""
+        with self._lock:
+            return sum(len(message.recipients) for message in self.messages)
+
+    def _record(self, received_at: float, mail_from: str, recipients: List[str], raw: bytes):
+        headers = BytesHeaderParser().parsebytes(raw)
+        subject = str(make_header(decode_header(headers.get("Subject", ""))))
+        message = ReceivedMessage(received_at, mail_from, list(recipients), subject, len(raw))
+        with self._lock:
+            self.messages.append(message)
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Run a local SMTP sink")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8025)
+    args = parser.parse_args()
+
+    sink = SMTPSink(args.host, args.port).start()
+    print(f"📥 SMTP sink listening on {args.host}:{args.port} (Ctrl+C to stop)")
+    try:
+        while True:
+            time.sleep(5)
+            print(f"📨 Received {sink.message_count()} messages")
+    except KeyboardInterrupt:
+        sink.stop()
@@ -0,0 +1,7 @@
+import os
+
+from app.log import Log
+
+# The log writer keeps the stream it starts with, and pytest closes its captured
+# sys.stdout at exit; tests don't check log output, so discard it
+Log.configure(open(os.devnull, "w"))
@@ -0,0 +1,70 @@
+import pytest
+from fastapi.testclient import TestClient
+
+from app.main import app
+from app.scheduler import ReminderScheduler
+from app.subscribers import SubscriberRegistry
+
+TOKEN = "s3cret"
+
+client = TestClient(app)
+
+TOPIC_REQUESTS = [
+    ("post", "/topics/cs101/subscribers", {"json": {"email": "a@example.com", "name": "Ann"}}),
+    ("get", "/topics/cs101/subscribers", {}),
+    ("delete", "/topics/cs101/subscribers/a@example.com", {}),
+    ("post", "/task-reminder", {"json": {
+        "task": "Essay", "deadline": "2099-01-15 23:59", "difficulty": "easy", "topic": "cs101",
+    }}),
+]
+
+
+@pytest.fixture(autouse=True)
+def clean():
+    SubscriberRegistry.clear()
+    yield
+    SubscriberRegistry.clear()
+    ReminderScheduler.clear()
+
+
+def request(method, path, kwargs, token=None):
+    headers = {"X-Admin-Token": token} if token is not None else {}
+    return getattr(client, method)(path, headers=headers, **kwargs)
+
+
+@pytest.mark.parametrize("method, path, kwargs", TOPIC_REQUESTS)
+def test_topic_endpoints_are_disabled_without_admin_token(monkeypatch, method, path, kwargs):
+    monkeypatch.delenv("ADMIN_TOKEN", raising=False)
+    assert request(method, path, kwargs, TOKEN).status_code == 403
+
+
+@pytest.mark.parametrize("method, path, kwargs", TOPIC_REQUESTS)
+@pytest.mark.parametrize("token", [None, "", "wrong", TOKEN + "x"])
+def test_topic_endpoints_reject_a_wrong_token(monkeypatch, method, path, kwargs, token):
+    monkeypatch.setenv("ADMIN_TOKEN", TOKEN)
+    assert request(method, path, kwargs, token).status_code == 401
+    assert SubscriberRegistry.topics() == {}
+    assert ReminderScheduler.get_scheduled_jobs() == []
+
+
+def test_topic_endpoints_with_the_admin_token(monkeypatch):
+    monkeypatch.setenv("ADMIN_TOKEN", TOKEN)
+
+    response = request(*TOPIC_REQUESTS[0], TOKEN)
+    assert response.status_code == 200
+    assert response.json() == {"topic": "cs101", "count": 1, "subscribers": [{"email": "a@example.com", "name": "Ann"}]}
+    assert request(*TOPIC_REQUESTS[1], TOKEN).json()["count"] == 1
+
+    response = request(*TOPIC_REQUESTS[3], TOKEN)
+    assert response.status_code == 200
+    assert response.json()["topic"] == "cs101"
+    assert all(job["id"].startswith("topic_cs101_task_Essay_") for job in ReminderScheduler.get_scheduled_jobs())
+
+    assert request(*TOPIC_REQUESTS[2], TOKEN).json()["count"] == 0
+    assert request(*TOPIC_REQUESTS[2], TOKEN).status_code == 404
+
+
+def test_task_reminder_without_topic_needs_no_token(monkeypatch):
+    monkeypatch.delenv("ADMIN_TOKEN", raising=False)
+    response = client.post("/task-reminder", json={"task": "Essay", "deadline": "2099-01-15 23:59", "difficulty": "easy"})
+    assert response.status_code == 200
@@ -0,0 +1,52 @@
+from datetime import datetime, timedelta
+import threading
+
+from app.clock import Clock, SystemClock, VirtualClock
+
+START = datetime(2030, 1, 7, 9, 0)
+
+
+def test_virtual_clock_only_moves_when_told():
+    clock = VirtualClock(START)
+    assert clock.now() == START
+    assert clock.time() == START.timestamp()
+
+    clock.advance(timedelta(minutes=5))
+    assert clock.now() == START + timedelta(minutes=5)
+
+
+def test_advance_to_never_goes_backwards():
+    clock = VirtualClock(START)
+    clock.advance_to((START + timedelta(hours=1)).timestamp())
+    clock.advance_to(START.timestamp())
+    clock.advance(timedelta(minutes=-5))
+
+    assert clock.now() == START + timedelta(hours=1)
+
+
+def test_wait_until_jumps_to_the_deadline():
+    clock = VirtualClock(START)
+    condition = threading.Condition()
+    deadline = (START + timedelta(days=3)).timestamp()
+
+    with condition:
+        clock.wait_until(condition, deadline)
+    assert clock.time() == deadline
+
+
+def test_use_swaps_clocks_and_returns_the_previous_one():
+    clock = VirtualClock(START)
+    previous = Clock.use(clock)
+    try:
+        assert Clock.get() is clock
+        assert Clock.is_virtual()
+        assert Clock.now() == START
+        assert Clock.time() == START.timestamp()
+    finally:
+        assert Clock.use(previous) is clock
+    assert Clock.get() is previous
+
+
+def test_system_clock_follows_wall_time():
+    clock = SystemClock()
+    assert abs(clock.time() - datetime.now().timestamp()) < 1
@@ -0,0 +1,136 @@
+from collections import Counter
+from datetime import datetime
+from email import message_from_string
+from email.header import decode_header, make_header
+
+import pytest
+
+from app.clock import Clock, VirtualClock
+from app.email_service import EmailService
+from app.scheduler import ReminderScheduler
+from app.subscribers import Subscriber, SubscriberRegistry
+from benchmarks.smtp_sink import SMTPSink
+
+TOPIC = "cs101"
+
+
+@pytest.fixture
+def sink(monkeypatch):
+    sink = SMTPSink(port=0).start()
+    monkeypatch.setattr(EmailService, "SMTP_SERVER", sink.address[0])
+    monkeypatch.setattr(EmailService, "SMTP_PORT", sink.address[1])
+    monkeypatch.setattr(EmailService, "SMTP_USE_TLS", False)
+    monkeypatch.setattr(EmailService, "SMTP_USE_AUTH", False)
+    monkeypatch.setattr(EmailService, "SMTP_MAX_RECIPIENTS", 100)
+    monkeypatch.setattr(EmailService, "FANOUT_CONNECTIONS", 4)
+    yield sink
+    sink.stop()
+
+
+def subscribers(count, named_every=0):
+    return [
+        Subscriber(f"student{i}@example.com", f"Student {i}" if named_every and i % named_every == 0 else None)
+        for i in range(count)
+    ]
+
+
+def send(recipients):
+    return EmailService.send_task_reminder_to_topic(
+        "Assignment 3", "2030-01-15 23:59", "15 minutes", "15min", TOPIC, recipients
+    )
+
+
+def batch_sizes(sink):
+    return Counter(len(message.recipients) for message in sink.messages)
+
+
+def test_shared_message_is_batched_by_max_recipients(sink):
+    result = send(subscribers(250))
+
+    assert result == {"sent": 250, "failed": 0, "transactions": 3}
+    assert batch_sizes(sink) == {100: 2, 50: 1}
+    assert sorted(r for message in sink.messages for r in message.recipients) == sorted(
+        s.email for s in subscribers(250)
+    )
+
+
+def test_max_recipients_setting_is_used(sink, monkeypatch):
+    monkeypatch.setattr(EmailService, "SMTP_MAX_RECIPIENTS", 7)
+    assert send(subscribers(20)) == {"sent": 20, "failed": 0, "transactions": 3}
+    assert batch_sizes(sink) == {7: 2, 6: 1}
+
+
+def test_named_subscribers_get_their_own_message(sink):
+    result = send(subscribers(10, named_every=2))
+
+    # 5 unnamed share one transaction, 5 named get one each
+    assert result == {"sent": 10, "failed": 0, "transactions": 6}
+    assert batch_sizes(sink) == {5: 1, 1: 5}
+    assert {message.subject for message in sink.messages} == {"⏰ UPCOMING Reminder: Assignment 3"}
+
+
+def test_refused_recipients_are_counted_as_failed(sink):
+    recipients = subscribers(10, named_every=5)
+    # Two unnamed in the shared batch, and one of the two named subscribers
+    sink.refuse = {"student1@example.com", "student2@example.com", "student5@example.com"}
+
+    result = send(recipients)
+
+    assert result == {"sent": 7, "failed": 3, "transactions": 3}
+    delivered = {r for message in sink.messages for r in message.recipients}
+    assert delivered == {s.email for s in recipients} - sink.refuse
+
+
+def test_unreachable_server_fails_every_recipient(sink, monkeypatch):
+    sink.stop()
+    monkeypatch.setattr(EmailService, "SMTP_PORT", 1)
+
+    assert send(subscribers(150, named_every=3)) == {"sent": 0, "failed": 150, "transactions": 0}
+
+
+def test_message_template_matches_the_email_package():
+    subject, body = EmailService._create_task_email("Essay", "2030-01-15 23:59", "NOW", "exact", "Zoë")
+    build = EmailService._message_template(subject)
+
+    for raw in (build("zoe@example.com", body), EmailService._build_message(subject, body, "zoe@example.com")):
+        message = message_from_string(raw)
+        assert message["To"] == "zoe@example.com"
+        assert message["From"] == EmailService.SENDER_EMAIL
+        assert str(make_header(decode_header(message["Subject"]))) == subject
+        [part] = message.get_payload()
+        assert part.get_content_type() == "text/html"
+        assert part.get_payload(decode=True).decode(part.get_content_charset()) == body
+
+
+def test_template_fills_in_each_recipient():
+    subject, _ = EmailService._create_task_email("Essay", "2030-01-15 23:59", "NOW", "exact")
+    build = EmailService._message_template(subject)
+
+    first = message_from_string(build("a@example.com", "<p>first</p>"))
+    second = message_from_string(build("b@example.com", "<p>second</p>"))
+    assert (first["To"], second["To"]) == ("a@example.com", "b@example.com")
+    assert second.get_payload()[0].get_payload(decode=True) == b"<p>second</p>"
+
+
+def test_recipient_name_is_escaped():
+    _, body = EmailService._create_task_email(
+        "Essay", "2030-01-15 23:59", "NOW", "exact", '<img src=x onerror="alert(1)">'
+    )
+    assert "<img" not in body
+    assert "Hi &lt;img src=x onerror=&quot;alert(1)&quot;&gt;," in body
+
+
+def test_topic_reminder_reaches_subscribers_through_replay(sink):
+    previous = Clock.use(VirtualClock(datetime(2030, 1, 7, 9, 0)))
+    SubscriberRegistry.clear()
+    try:
+        for subscriber in subscribers(30, named_every=3):
+            SubscriberRegistry.subscribe(TOPIC, subscriber.email, subscriber.name)
+        ReminderScheduler.schedule_task_reminder("Essay", datetime(2030, 1, 7, 10, 0), [], TOPIC)
+
+        assert ReminderScheduler.replay(datetime(2030, 1, 7, 11, 0)) == 3
+        assert sum(len(message.recipients) for message in sink.messages) == 90
+    finally:
+        SubscriberRegistry.clear()
+        ReminderScheduler.clear()
+        Clock.use(previous)
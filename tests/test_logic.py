@@ -0,0 +1,80 @@
+from datetime import datetime, time, timedelta, timezone
+
+import pytest
+
+from app.clock import Clock, VirtualClock
+from app.logic import ReminderLogic
+
+NOW = datetime(2030, 1, 7, 7, 0)  # a Monday
+
+
+@pytest.fixture(autouse=True)
+def clock():
+    previous = Clock.use(VirtualClock(NOW))
+    yield
+    Clock.use(previous)
+
+
+def all_pages(recurrence, limit):
+    pages, cursor = [], None
+    while True:
+        page, cursor = ReminderLogic.page_fixed_reminders(recurrence, cursor, limit)
+        pages.append(page)
+        if cursor is None:
+            return pages
+
+
+@pytest.mark.parametrize("frequency, interval, expected_days", [
+    ("daily", 1, [0, 1, 2, 3, 4, 5, 6, 7, 8, 9]),
+    ("daily", 3, [0, 3, 6, 9]),
+    ("weekly", 1, [0, 7]),
+    ("weekly", 2, [0]),
+])
+def test_build_fixed_recurrence(frequency, interval, expected_days):
+    recurrence = ReminderLogic.build_fixed_recurrence(time(9, 0), frequency, days_ahead=10, interval=interval)
+    assert list(recurrence.occurrences()) == [NOW.replace(hour=9) + timedelta(days=day) for day in expected_days]
+
+
+def test_build_fixed_recurrence_custom_requires_a_rule():
+    with pytest.raises(ValueError, match="requires an rrule"):
+        ReminderLogic.build_fixed_recurrence(time(9, 0), "custom", days_ahead=10)
+
+
+def test_weekly_byday_pages():
+    recurrence = ReminderLogic.build_fixed_recurrence(
+        time(9, 0), "custom", days_ahead=14, rule="FREQ=WEEKLY;BYDAY=MO,WE,FR"
+    )
+    pages = all_pages(recurrence, limit=4)
+
+    assert [[d.strftime("%a %d") for d in page] for page in pages] == [
+        ["Mon 07", "Wed 09", "Fri 11", "Mon 14"],
+        ["Wed 16", "Fri 18"],
+    ]
+
+
+def test_pages_start_after_now():
+    Clock.get().advance(timedelta(hours=3))
+    recurrence = ReminderLogic.build_fixed_recurrence(time(9, 0), "daily", days_ahead=3)
+    assert all_pages(recurrence, limit=50) == [[NOW.replace(hour=9) + timedelta(days=day) for day in (1, 2)]]
+
+
+def test_full_last_page_has_no_cursor():
+    recurrence = ReminderLogic.build_fixed_recurrence(time(9, 0), "daily", days_ahead=4)
+    assert [len(page) for page in all_pages(recurrence, limit=2)] == [2, 2]
+
+
+def test_cursor_round_trip():
+    for value in (datetime(2030, 1, 7, 9, 0), datetime(2030, 12, 31, 23, 59, 30)):
+        cursor = ReminderLogic.encode_cursor(value)
+        assert "=" not in cursor
+        assert ReminderLogic.decode_cursor(cursor) == value
+
+
+@pytest.mark.parametrize("cursor", [
+    "not a cursor",
+    "%%%",
+    ReminderLogic.encode_cursor(datetime(2030, 1, 7, 9, 0, tzinfo=timezone.utc)),
+])
+def test_invalid_cursor(cursor):
+    with pytest.raises(ValueError, match="Invalid cursor"):
+        ReminderLogic.decode_cursor(cursor)
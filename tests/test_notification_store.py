@@ -0,0 +1,139 @@
+from datetime import datetime, timedelta
+
+import pytest
+
+from app.notification_store import NotificationStore, TASK, FIXED
+
+START = datetime(2030, 1, 1, 9, 0)
+
+
+def ts(minutes: int) -> int:
+    return int((START + timedelta(minutes=minutes)).timestamp())
+
+
+def add(store, minutes, name="Task", detail="2030-01-01 10:00", kind=TASK, notification_type="exact", topic=None):
+    return store.add(START + timedelta(minutes=minutes), kind, notification_type, name, detail, topic)
+
+
+def test_pop_due_returns_notifications_in_fire_order():
+    store = NotificationStore()
+    for minutes in (30, 10, 20, 0, 40):
+        add(store, minutes, name=f"Task {minutes}")
+
+    assert store.next_fire_time() == ts(0)
+    assert [n[3] for n in store.pop_due(ts(20))] == ["Task 0", "Task 10", "Task 20"]
+    assert store.next_fire_time() == ts(30)
+    assert len(store) == 2
+    assert [n[3] for n in store.pop_due(ts(100))] == ["Task 30", "Task 40"]
+    assert store.next_fire_time() is None
+    assert len(store) == 0
+
+
+def test_add_reports_new_earliest():
+    store = NotificationStore()
+    assert add(store, 10) is True
+    assert add(store, 20) is False
+    assert add(store, 5) is True
+
+
+def test_pop_due_returns_full_rows():
+    store = NotificationStore()
+    add(store, 0, name="Vitamin D", detail="09:00", kind=FIXED, notification_type="15min")
+    add(store, 1, name="Essay", topic="cs101")
+
+    assert store.pop_due(ts(1)) == [
+        (ts(0), FIXED, "15min", "Vitamin D", "09:00", None),
+        (ts(1), TASK, "exact", "Essay", "2030-01-01 10:00", "cs101"),
+    ]
+
+
+def test_remove_cancels_matching_rows_only():
+    store = NotificationStore()
+    for minutes in range(10):
+        add(store, minutes, name="even" if minutes % 2 == 0 else "odd")
+
+    assert store.remove(lambda n: n[3] == "odd") == 5
+    assert store.remove(lambda n: n[3] == "odd") == 0
+    assert len(store) == 5
+    assert store.next_fire_time() == ts(0)
+    assert [n[0] for n in store.pop_due(ts(100))] == [ts(m) for m in range(0, 10, 2)]
+
+
+def test_remove_scans_past_one_chunk():
+    store = NotificationStore()
+    for minutes in range(10000):
+        add(store, minutes, name=f"Task {minutes}")
+
+    assert store.remove(lambda n: n[3] == "Task 9999") == 1
+    assert len(store) == 9999
+
+
+def test_cancelled_earliest_is_skipped():
+    store = NotificationStore()
+    add(store, 0, name="cancelled")
+    add(store, 5, name="kept")
+    store.remove(lambda n: n[3] == "cancelled")
+
+    assert store.next_fire_time() == ts(5)
+    assert [n[3] for n in store.pop_due(ts(100))] == ["kept"]
+
+
+def test_rows_are_reused_after_firing():
+    store = NotificationStore()
+    for minutes in range(5):
+        add(store, minutes)
+    store.pop_due(ts(100))
+    rows = len(store._code)
+
+    for minutes in range(5):
+        add(store, minutes)
+    assert len(store._code) == rows
+    assert len(store.pop_due(ts(100))) == 5
+
+
+def test_strings_are_shared_and_freed():
+    store = NotificationStore()
+    for notification_type in ("15min", "5min", "exact"):
+        store.add(START, TASK, notification_type, "Essay", "2030-01-01 10:00", "cs101")
+
+    # One copy of each string, referenced by all three rows
+    assert sorted(s for s in store._strings if s is not None) == ["2030-01-01 10:00", "Essay", "cs101"]
+    assert sorted(store._string_refs) == [3, 3, 3]
+
+    store.pop_due(ts(0))
+    assert all(s is None for s in store._strings)
+    assert store._string_ids == {}
+
+    # Freed string ids are reused
+    strings = len(store._strings)
+    add(store, 0, name="Other", detail="Detail", topic="topic")
+    assert len(store._strings) == strings
+
+
+def test_add_out_of_range_leaves_store_unchanged():
+    store = NotificationStore()
+    add(store, 0)
+    store.pop_due(ts(0))
+    free_rows = list(store._free_rows)
+
+    with pytest.raises(ValueError):
+        store.add(datetime(2200, 1, 15, 23, 59), TASK, "exact", "Late", "2200-01-15 23:59")
+
+    assert list(store._free_rows) == free_rows
+    assert store._string_ids == {}
+    assert len(store) == 0
+
+
+def test_clear():
+    store = NotificationStore()
+    for minutes in range(10):
+        add(store, minutes, name=f"Task {minutes}")
+    store.clear()
+
+    assert len(store) == 0
+    assert store.next_fire_time() is None
+    assert store.pop_due(ts(100)) == []
+    assert list(store.items()) == []
+
+    add(store, 1)
+    assert [n[0] for n in store.pop_due(ts(100))] == [ts(1)]
@@ -0,0 +1,82 @@
+from datetime import datetime, timedelta
+import time
+
+import pytest
+from dateutil.rrule import rrulestr
+
+from app.recurrence import Recurrence
+
+START = datetime(2030, 1, 7, 9, 0)  # a Monday
+END = START + timedelta(days=3650)
+
+
+@pytest.mark.parametrize("rule", [
+    "FREQ=DAILY;BYMONTH=2;BYMONTHDAY=30",
+    "FREQ=MINUTELY;BYMONTH=2;BYMONTHDAY=30",
+    "FREQ=DAILY;INTERVAL=7;BYDAY=TU",
+])
+def test_unsatisfiable_rule_stops_at_the_end(rule):
+    recurrence = Recurrence.from_rrule(rule, START, END)
+
+    started = time.perf_counter()
+    assert recurrence.after(START) is None
+    assert list(recurrence.occurrences(after=START)) == []
+    assert time.perf_counter() - started < 1
+
+
+def test_until_is_capped_at_the_end():
+    recurrence = Recurrence.from_rrule("FREQ=YEARLY;UNTIL=20500101T000000", START, START + timedelta(days=800))
+    assert list(recurrence.occurrences()) == [START, START.replace(year=2031), START.replace(year=2032)]
+
+
+@pytest.mark.parametrize("rule", [
+    "DTSTART:20250101T000000Z\nRRULE:FREQ=DAILY",
+    "DTSTART:20250101T000000\nRRULE:FREQ=DAILY",
+])
+def test_dtstart_in_rule_is_rejected(rule):
+    with pytest.raises(ValueError, match="DTSTART"):
+        Recurrence.from_rrule(rule, START, END)
+
+
+@pytest.mark.parametrize("period, interval", [("daily", 1), ("daily", 3), ("weekly", 1), ("weekly", 2)])
+def test_after_re_anchors_on_the_period(period, interval):
+    recurrence = Recurrence.every(period, START, interval, END)
+    step = timedelta(days=interval) if period == "daily" else timedelta(weeks=interval)
+
+    for t in (START - timedelta(days=1), START, START + timedelta(days=45, hours=3), START + 100 * step):
+        expected = START + ((t - START) // step + 1) * step if t >= START else START
+        assert recurrence.after(t) == expected
+        assert recurrence.after(expected, inclusive=True) == expected
+
+
+def test_after_matches_dateutil_for_rules_with_by_parts():
+    rule = "FREQ=WEEKLY;INTERVAL=2;BYDAY=MO,WE,FR;BYHOUR=9,18;BYMINUTE=30"
+    recurrence = Recurrence.from_rrule(rule, START, END)
+    expected = list(rrulestr(rule, dtstart=START).replace(until=END))
+
+    assert list(recurrence.occurrences()) == expected
+    for i in (0, 1, 2, 5, 500, len(expected) - 2):
+        assert recurrence.after(expected[i]) == expected[i + 1]
+    assert recurrence.after(expected[-1]) is None
+
+
+def test_occurrences_after_continues_the_series():
+    recurrence = Recurrence.every("weekly", START, 1, START + timedelta(weeks=4))
+    assert list(recurrence.occurrences(after=START + timedelta(weeks=2))) == [
+        START + timedelta(weeks=3), START + timedelta(weeks=4),
+    ]
+
+
+@pytest.mark.parametrize("rule", [
+    "FREQ=SECONDLY",
+    "FREQ=MINUTELY;BYSECOND=0,30",
+])
+def test_more_than_once_a_minute_is_rejected(rule):
+    with pytest.raises(ValueError, match="at most once a minute"):
+        Recurrence.from_rrule(rule, START, END)
+
+
+@pytest.mark.parametrize("rule", ["FREQ=FORTNIGHTLY", "RRULE:FREQ=DAILY\nEXDATE:20300108T090000"])
+def test_invalid_rules_are_rejected(rule):
+    with pytest.raises(ValueError, match="Invalid rrule"):
+        Recurrence.from_rrule(rule, START, END)
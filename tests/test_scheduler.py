@@ -0,0 +1,135 @@
+from datetime import datetime, time, timedelta
+import re
+
+import pytest
+
+from app.clock import Clock, SystemClock, VirtualClock
+from app.scheduler import ReminderScheduler, store
+
+START = datetime(2030, 1, 7, 0, 0)  # a Monday
+
+
+@pytest.fixture
+def clock():
+    clock = VirtualClock(START)
+    previous = Clock.use(clock)
+    ReminderScheduler.clear()
+    yield clock
+    ReminderScheduler.clear()
+    Clock.use(previous)
+
+
+def replay(until):
+    fired = []
+    ReminderScheduler.replay(until, deliver=fired.append)
+    return [(datetime.fromtimestamp(n[0]), n[2], n[3]) for n in fired]
+
+
+def series_jobs():
+    return [job for job in ReminderScheduler.get_scheduled_jobs() if "_series_" in job["id"]]
+
+
+def test_fixed_series_is_listed_before_its_notifications_are_stored(clock):
+    ReminderScheduler.schedule_fixed_reminder("Pills", time(9, 0), 7)
+
+    assert len(store) == 0
+    [job] = ReminderScheduler.get_scheduled_jobs()
+    assert re.fullmatch(r"fixed_Pills_series_\d+", job["id"])
+    assert job["next_run_time"] == "2030-01-07 08:45:00"
+    assert job["trigger"] == "recurrence[09:00, until=2030-01-13 23:59:59]"
+
+
+def test_remove_job_cancels_a_whole_series(clock):
+    ReminderScheduler.schedule_fixed_reminder("Pills", time(9, 0), 7)
+    replay(START + timedelta(hours=8, minutes=50))
+    assert len(store) == 2
+
+    assert ReminderScheduler.remove_job(series_jobs()[0]["id"]) is True
+    assert len(store) == 0
+    assert ReminderScheduler.get_scheduled_jobs() == []
+    assert replay(START + timedelta(days=14)) == []
+
+
+def test_removing_one_notification_keeps_the_series(clock):
+    ReminderScheduler.schedule_fixed_reminder("Pills", time(9, 0), 2)
+    replay(START + timedelta(hours=8, minutes=50))
+    exact = [job["id"] for job in ReminderScheduler.get_scheduled_jobs() if "_exact_" in job["id"]]
+
+    assert ReminderScheduler.remove_job(exact[0]) is True
+    fired = replay(START + timedelta(days=3))
+    assert [(t.strftime("%d %H:%M"), kind) for t, kind, _ in fired] == [
+        ("07 08:55", "5min"),
+        ("08 08:45", "15min"), ("08 08:55", "5min"), ("08 09:00", "exact"),
+    ]
+
+
+def test_late_refill_still_delivers_due_notifications(clock):
+    ReminderScheduler.schedule_fixed_reminder("Pills", time(9, 0), 3)
+    replay(START + timedelta(days=1))
+
+    # The dispatcher wakes up well after the series was due for a refill
+    clock.advance_to((START + timedelta(days=1, hours=8, minutes=57)).timestamp())
+    ReminderScheduler._refill_due(clock.time())
+    late = [(datetime.fromtimestamp(n[0]).strftime("%d %H:%M"), n[2]) for n in store.pop_due(clock.time())]
+
+    assert late == [("08 08:45", "15min"), ("08 08:55", "5min")]
+    assert [kind for _, kind, _ in replay(START + timedelta(days=1, hours=9))] == ["exact"]
+
+
+def test_fixed_series_refills_across_days(clock):
+    ReminderScheduler.schedule_fixed_reminder("Pills", time(9, 0), 3)
+    ReminderScheduler.schedule_fixed_reminder("Stretch", time(0, 10), 3)
+
+    # Each occurrence is stored shortly before its first notification, never all at once
+    assert len(store) == 2
+    fired = replay(START + timedelta(days=5))
+
+    assert [(t.strftime("%d %H:%M"), kind, name) for t, kind, name in fired] == [
+        ("07 00:05", "5min", "Stretch"), ("07 00:10", "exact", "Stretch"),
+        ("07 08:45", "15min", "Pills"), ("07 08:55", "5min", "Pills"), ("07 09:00", "exact", "Pills"),
+        ("07 23:55", "15min", "Stretch"), ("08 00:05", "5min", "Stretch"), ("08 00:10", "exact", "Stretch"),
+        ("08 08:45", "15min", "Pills"), ("08 08:55", "5min", "Pills"), ("08 09:00", "exact", "Pills"),
+        ("08 23:55", "15min", "Stretch"), ("09 00:05", "5min", "Stretch"), ("09 00:10", "exact", "Stretch"),
+        ("09 08:45", "15min", "Pills"), ("09 08:55", "5min", "Pills"), ("09 09:00", "exact", "Pills"),
+    ]
+    assert len(store) == 0
+    assert ReminderScheduler.get_scheduled_jobs() == []
+
+
+def test_replay_fires_in_order_exactly_once(clock):
+    deadlines = [START + timedelta(hours=hours, minutes=minutes) for hours, minutes in ((5, 0), (1, 30), (3, 7), (1, 30))]
+    for i, deadline in enumerate(deadlines):
+        ReminderScheduler.schedule_task_reminder(f"Task {i}", deadline, [])
+
+    seen = []
+
+    def deliver(notification):
+        # Each notification fires at its own fire time
+        assert clock.time() == notification[0]
+        seen.append(notification)
+
+    assert ReminderScheduler.replay(START + timedelta(days=1), deliver=deliver) == 12
+    assert [n[0] for n in seen] == sorted(n[0] for n in seen)
+    assert len(set(seen)) == 12
+    assert clock.now() == START + timedelta(days=1)
+
+    assert ReminderScheduler.replay(START + timedelta(days=2), deliver=deliver) == 0
+    assert len(seen) == 12
+
+
+def test_replay_stops_at_until(clock):
+    ReminderScheduler.schedule_task_reminder("Essay", START + timedelta(hours=1), [])
+
+    fired = replay(START + timedelta(minutes=50))
+    assert [kind for _, kind, _ in fired] == ["15min"]
+    assert clock.now() == START + timedelta(minutes=50)
+    assert len(store) == 2
+
+
+def test_replay_needs_a_virtual_clock():
+    previous = Clock.use(SystemClock())
+    try:
+        with pytest.raises(RuntimeError, match="virtual clock"):
+            ReminderScheduler.replay(datetime.now())
+    finally:
+        Clock.use(previous)
@@ -0,0 +1,47 @@
+import pytest
+
+from app.subscribers import Subscriber, SubscriberRegistry
+
+
+@pytest.fixture(autouse=True)
+def registry():
+    SubscriberRegistry.clear()
+    yield
+    SubscriberRegistry.clear()
+
+
+def test_subscribe_in_order_and_update_names():
+    assert SubscriberRegistry.subscribe("cs101", "a@example.com") is True
+    assert SubscriberRegistry.subscribe("cs101", "b@example.com", "Bea") is True
+    assert SubscriberRegistry.subscribe("cs101", "a@example.com", "Ann") is False
+
+    assert SubscriberRegistry.subscribers("cs101") == [
+        Subscriber("a@example.com", "Ann"),
+        Subscriber("b@example.com", "Bea"),
+    ]
+
+
+def test_topics_are_independent():
+    SubscriberRegistry.subscribe("cs101", "a@example.com")
+    SubscriberRegistry.subscribe("cs101", "b@example.com")
+    SubscriberRegistry.subscribe("ops", "a@example.com")
+
+    assert SubscriberRegistry.topics() == {"cs101": 2, "ops": 1}
+    assert SubscriberRegistry.subscribers("unknown") == []
+
+
+def test_unsubscribe_drops_empty_topics():
+    SubscriberRegistry.subscribe("cs101", "a@example.com")
+
+    assert SubscriberRegistry.unsubscribe("cs101", "b@example.com") is False
+    assert SubscriberRegistry.unsubscribe("cs101", "a@example.com") is True
+    assert SubscriberRegistry.unsubscribe("cs101", "a@example.com") is False
+    assert SubscriberRegistry.topics() == {}
+
+
+def test_subscribers_is_a_snapshot():
+    SubscriberRegistry.subscribe("cs101", "a@example.com")
+    snapshot = SubscriberRegistry.subscribers("cs101")
+    SubscriberRegistry.subscribe("cs101", "b@example.com")
+
+    assert snapshot == [Subscriber("a@example.com")]